@@ -118,13 +118,16 @@ class DetectionAgent(BaseAgent):
                     results['memory_pool_specialized'] = memory_pool_result
                     log_info(f"内存池专项检测完成，发现 {len(memory_pool_result.get('issues', []))} 个问题")
             
-            # 3.2 自定义规则 (按需开启)
-            if analysis_config.get('enable_custom_rules', True):
-                # log_info("运行自定义规则检测...")
-                # custom_rules_result = await self.custom_rules_engine.detect(project_path)
-                # if custom_rules_result.get('success'):
-                #     results['custom_rules'] = custom_rules_result
-                pass 
+            # 3.2 自定义规则 (按需开启，默认关闭)
+            # 增量检测：复用上次结果，只重扫新增/修改的文件及 changed_files 指定的文件
+            if analysis_config.get('enable_custom_rules', False):
+                log_info("运行自定义规则检测...")
+                custom_rules_result = await self.custom_rules_engine.detect_incremental(
+                    project_path,
+                    analysis_config.get('changed_files')
+                )
+                if custom_rules_result.get('success'):
+                    results['custom_rules'] = custom_rules_result
 
             # --- 4. 结果聚合与解析 ---
             
@@ -155,9 +155,19 @@ class ValidationAgent:
             log_info(f"[ValidationAgent] process - 开始优先级评分 (输入 {len(deduped)} 个 issues)...")
             ranked_pairs: List[Tuple[float, Dict[str, Any]]] = []
             
+            # 批量评分；批量失败时退回逐条评分，以便定位出错的 issue
+            try:
+                batch_results = self.scorer.score_batch(deduped, context)
+            except Exception as batch_err:
+                log_error(f"[ValidationAgent] 批量评分失败，改为逐条评分: {batch_err}")
+                batch_results = None
+            
             for i, it in enumerate(deduped):
                 try:
-                    result = self.scorer.score(it, context)
+                    if batch_results is not None:
+                        result = batch_results[i]
+                    else:
+                        result = self.scorer.score(it, context)
                     
                     if not isinstance(result, tuple) or len(result) != 3:
                         log_error(f"[ValidationAgent] PriorityScorer.score() 返回格式错误 (Issue {i}): {type(result)}, 值={result}")
@@ -58,6 +58,11 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
     LOG_FILE: str = Field(default="./data/logs/app.log", env="LOG_FILE")
 
+    # 静态分析
+    # 允许 Clang-Tidy 对上传项目运行 compiledb（make -n）生成编译数据库；
+    # make -n 仍会执行 Makefile 中的 $(shell ...) 以及 '+' / $(MAKE) 行，默认关闭
+    CLANG_TIDY_MAKE_DRY_RUN: bool = Field(default=False, env="CLANG_TIDY_MAKE_DRY_RUN")
+
     # CORS
     ALLOWED_ORIGINS: List[str] = Field(
         default=["http://localhost:3000", "http://127.0.0.1:3000"],
@@ -162,7 +162,7 @@ def create_project_file(
         log_error(
             f"创建文件记录失败: {str(e)}",
             extra={
-                "filename": filename,
+                "file_name": filename,  # LogRecord 已有 filename 属性，不能用作 extra 键
                 "project_id": project_id,
                 "error_details": str(e),
             },
@@ -12,6 +12,11 @@ from database.crud import ProjectCRUD, AnalysisCRUD
 from utils.logger import log_info, log_error
 from config import settings  # 确保 config.py 定义了 RESULTS_DIR 等路径
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 
 # ---------- UTC / 序列化工具 ----------
 def utc_now() -> datetime:
@@ -37,6 +42,24 @@ def epoch_ms(dt: Optional[datetime]) -> Optional[int]:
     dtu = to_utc_aware(dt)
     return int(dtu.timestamp() * 1000)
 
+def dump_json_compact(obj: Any, file_path: str) -> None:
+    """
+    紧凑写出大体积 JSON（完整报告可含数万条问题）：
+    安装了 orjson 时用其序列化（UTF-8 原样输出，等价 ensure_ascii=False），
+    否则退回标准库并去掉缩进与分隔符空格
+    """
+    if orjson is not None:
+        try:
+            data = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            data = None
+        if data is not None:
+            with open(file_path, "wb") as f:
+                f.write(data)
+            return
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
+
 
 # ---------- JSON 解析容错 ----------
 def _try_json_loads(v: Any) -> Optional[Dict[str, Any]]:
@@ -192,8 +215,7 @@ class AnalysisService:
 
             # 完整报告
             report_file = os.path.join(result_dir, "analysis_result.json")
-            with open(report_file, "w", encoding="utf-8") as f:
-                json.dump(report, f, indent=2, ensure_ascii=False)
+            dump_json_compact(report, report_file)
 
             # 归纳摘要（保持键名与你路由/前端一致），时间用UTC
             now = utc_now()
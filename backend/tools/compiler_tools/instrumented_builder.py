@@ -6,6 +6,7 @@
 调用关系：被dynamic_workflow调用
 """
 import os
+import asyncio
 import subprocess
 import shutil
 from typing import Dict, List, Any, Optional
@@ -182,7 +183,10 @@ class InstrumentedBuilder:
 
             log_info(f"执行CMake配置: {' '.join(cmake_args)}")
 
-            configure_result = subprocess.run(cmake_args, cwd=build_dir, capture_output=True, timeout=300)
+            # 在线程中运行阻塞的子进程，不占用事件循环（多个版本可并行构建）
+            configure_result = await asyncio.to_thread(
+                subprocess.run, cmake_args, cwd=build_dir, capture_output=True, timeout=300
+            )
             stdout = self._safe_decode_output(configure_result.stdout)
             stderr = self._safe_decode_output(configure_result.stderr)
 
@@ -193,7 +197,9 @@ class InstrumentedBuilder:
             build_args = ['cmake', '--build', '.', '--', '-j4']
             log_info("开始编译...")
 
-            build_result = subprocess.run(build_args, cwd=build_dir, capture_output=True, timeout=600)
+            build_result = await asyncio.to_thread(
+                subprocess.run, build_args, cwd=build_dir, capture_output=True, timeout=600
+            )
             stdout = self._safe_decode_output(build_result.stdout)
             stderr = self._safe_decode_output(build_result.stderr)
 
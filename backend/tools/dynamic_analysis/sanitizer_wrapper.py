@@ -6,6 +6,7 @@ Sanitizer工具封装器
 调用关系：被dynamic_executor调用
 """
 import os
+import asyncio
 import re
 import subprocess
 from typing import Dict, List, Any, Optional
@@ -80,7 +81,8 @@ class SanitizerWrapper:
             log_info(f"🔧 执行命令: {' '.join(cmd)}")
             log_info(f"📝 环境变量: ASAN_OPTIONS={env['ASAN_OPTIONS']}")
 
-            result = subprocess.run(
+            result = await asyncio.to_thread(
+                subprocess.run,
                 cmd,
                 capture_output=True,
                 text=True,
@@ -459,7 +461,8 @@ class SanitizerWrapper:
             if args:
                 cmd.extend(args)
             
-            result = subprocess.run(
+            result = await asyncio.to_thread(
+                subprocess.run,
                 cmd,
                 capture_output=True,
                 text=True,
@@ -547,7 +550,8 @@ class SanitizerWrapper:
             if args:
                 cmd.extend(args)
             
-            result = subprocess.run(
+            result = await asyncio.to_thread(
+                subprocess.run,
                 cmd,
                 capture_output=True,
                 text=True,
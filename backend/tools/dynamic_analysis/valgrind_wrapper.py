@@ -6,6 +6,7 @@ Valgrind工具封装器
 调用关系：被dynamic_executor调用
 """
 import os
+import asyncio
 import subprocess
 import xml.etree.ElementTree as ET
 from typing import Dict, List, Any, Optional
@@ -69,7 +70,8 @@ class ValgrindWrapper:
             # 准备输出文件
             output_dir = output_dir or '/tmp'
             os.makedirs(output_dir, exist_ok=True)  # ⭐ 确保目录存在
-            xml_output = os.path.join(output_dir, 'valgrind_memcheck.xml')
+            # 按可执行文件区分输出文件，并行分析多个程序时互不覆盖
+            xml_output = os.path.join(output_dir, f'valgrind_memcheck_{os.path.basename(executable_path)}.xml')
             
             # 构建Valgrind命令
             cmd = [
@@ -90,7 +92,8 @@ class ValgrindWrapper:
             log_info(f"🔧 执行命令: {' '.join(cmd)}")  # ⭐ 打印完整命令
 
             # 执行Valgrind
-            result = subprocess.run(
+            result = await asyncio.to_thread(
+                subprocess.run,
                 cmd,
                 capture_output=True,
                 text=True,
@@ -393,7 +396,8 @@ class ValgrindWrapper:
             
             # 准备输出文件
             output_dir = output_dir or '/tmp'
-            xml_output = os.path.join(output_dir, 'valgrind_helgrind.xml')
+            # 按可执行文件区分输出文件，并行分析多个程序时互不覆盖
+            xml_output = os.path.join(output_dir, f'valgrind_helgrind_{os.path.basename(executable_path)}.xml')
             
             # 构建Valgrind命令
             cmd = [
@@ -409,7 +413,8 @@ class ValgrindWrapper:
                 cmd.extend(args)
             
             # 执行Valgrind
-            result = subprocess.run(
+            result = await asyncio.to_thread(
+                subprocess.run,
                 cmd,
                 capture_output=True,
                 text=True,
@@ -551,7 +556,8 @@ class ValgrindWrapper:
                 cmd.extend(args)
             
             # 执行Valgrind
-            result = subprocess.run(
+            result = await asyncio.to_thread(
+                subprocess.run,
                 cmd,
                 capture_output=True,
                 text=True,
@@ -1,12 +1,12 @@
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
 import os, re, json
 from utils.logger import log_info, log_error
 
 # PatternLibrary 可选依赖
 try:
-    from tools.pattern_library import PatternLibrary
+    from tools.pattern_library import get_pattern_library
 except Exception:
-    PatternLibrary = None
+    get_pattern_library = None
 
 
 class FalsePositiveFilter:
@@ -22,7 +22,13 @@ class FalsePositiveFilter:
     _re_magic = re.compile(r"[-+]?\d*\.?\d+") 
 
     def __init__(self):
-        self.plib = PatternLibrary() if PatternLibrary else None
+        self.plib = get_pattern_library() if get_pattern_library else None
+        if self.plib:
+            # 共享实例常驻进程：每次创建过滤器时按 mtime 检查规则文件，修改后无需重启即可生效
+            try:
+                self.plib.reload()
+            except Exception as e:
+                log_error(f"[FalsePositiveFilter] 重新载入误报规则失败: {e}")
         # ⭐⭐⭐ （可选但推荐）确保 plib 加载日志 ⭐⭐⭐
         if self.plib:
              log_info("[FalsePositiveFilter] PatternLibrary 初始化成功。")
@@ -172,7 +178,8 @@ class FalsePositiveFilter:
                 sev = "low"
 
             # 12) 可疑误报标记
-            if self._is_suspected_fp(msg):  # ⭐ 删除第二个参数
+            _, suspected = self._classify_fp(msg)
+            if suspected:
                 it.setdefault("tags", []).append("need_human_review")
 
             out.append(it)
@@ -315,14 +322,9 @@ class FalsePositiveFilter:
         s = (sev or "medium").lower()
         return order[max(0, order.index(s) - 1)] if s in order else "medium"
 
-    def _is_common_fp(self, msg: str) -> bool:
-        try:
-            return bool(self.plib and self.plib.is_common_fp(msg))
-        except Exception:
-            return False
-
-    def _is_suspected_fp(self, msg: str) -> bool:
+    def _classify_fp(self, msg: str) -> Tuple[bool, bool]:
+        """返回 (是否常见误报, 是否可疑误报)，两者相互独立"""
         try:
-            return bool(self.plib and self.plib.is_suspected_fp(msg))
+            return self.plib.classify(msg) if self.plib else (False, False)
         except Exception:
-            return False
+            return (False, False)
@@ -1,7 +1,11 @@
-from typing import Dict, Any, List
-import os, re
+from typing import Dict, Any, List, Optional, Tuple
+import os, re, threading
 try:
     import yaml
+    try:
+        from yaml import CSafeLoader as _YamlLoader  # LibYAML 绑定，解析快一个数量级
+    except ImportError:
+        from yaml import SafeLoader as _YamlLoader
 except Exception:
     yaml = None
 from utils.logger import log_info, log_error
@@ -13,38 +17,82 @@ DEFAULT_RULES = {
     "suspected_fp_keywords": ["heuristic", "may be false positive"],
 }
 
+def _default_cfg_path() -> str:
+    return os.path.join(settings.PROJECT_ROOT, "configs/false_positive_rules.yaml")
+
+
 class PatternLibrary:
     """从 YAML 载入规则；缺省时使用内置默认值"""
     def __init__(self, cfg_path: str = None):
-        self.cfg_path = cfg_path or os.path.join(settings.PROJECT_ROOT, "configs/false_positive_rules.yaml")
+        self.cfg_path = cfg_path or _default_cfg_path()
         self._rules = None
+        self._mtime = None
 
     def get_rules(self) -> Dict[str, Any]:
         if self._rules is None:
+            self._mtime = self._cfg_mtime()
             self._rules = self._load()
         return self._rules
 
+    def reload(self) -> bool:
+        """配置文件的 mtime 变化时才重新载入；返回是否发生了重新载入"""
+        mtime = self._cfg_mtime()
+        if self._rules is not None and mtime == self._mtime:
+            return False
+        self._rules = self._load()
+        self._mtime = mtime
+        return True
+
     def is_common_fp(self, text: str) -> bool:
-        t = text.lower()
-        for k in self.get_rules().get("common_fp_keywords", []):
-            if k in t:
-                return True
-        return False
+        return self._contains_keyword(text.lower(), "common_fp_keywords")
 
     def is_suspected_fp(self, text: str) -> bool:
+        return self._contains_keyword(text.lower(), "suspected_fp_keywords")
+
+    def classify(self, text: str) -> Tuple[bool, bool]:
+        """只转换一次小写，分别匹配两类关键字：返回 (is_common_fp, is_suspected_fp)"""
         t = text.lower()
-        for k in self.get_rules().get("suspected_fp_keywords", []):
-            if k in t:
+        return (
+            self._contains_keyword(t, "common_fp_keywords"),
+            self._contains_keyword(t, "suspected_fp_keywords"),
+        )
+
+    def _contains_keyword(self, lowered: str, key: str) -> bool:
+        for k in self.get_rules().get(key, []):
+            if k in lowered:
                 return True
         return False
 
+    def _cfg_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.cfg_path).st_mtime
+        except OSError:
+            return None
+
     def _load(self) -> Dict[str, Any]:
         path = self.cfg_path
         if os.path.exists(path) and yaml is not None:
             try:
                 with open(path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f) or {}
+                    data = yaml.load(f, Loader=_YamlLoader) or {}
                 return {**DEFAULT_RULES, **data}
             except Exception as e:
                 log_error(f"加载规则失败，使用默认: {e}")
         return DEFAULT_RULES.copy()
+
+
+_INSTANCE: Optional[PatternLibrary] = None
+_LOCK = threading.Lock()
+
+
+def get_pattern_library(cfg_path: str = None) -> PatternLibrary:
+    """返回进程内共享的 PatternLibrary（线程安全的惰性单例，按配置路径区分）"""
+    global _INSTANCE
+    path = cfg_path or _default_cfg_path()
+    inst = _INSTANCE
+    if inst is not None and inst.cfg_path == path:
+        return inst
+    with _LOCK:
+        if _INSTANCE is None or _INSTANCE.cfg_path != path:
+            _INSTANCE = PatternLibrary(path)
+        return _INSTANCE
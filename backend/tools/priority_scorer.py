@@ -1,8 +1,14 @@
-from typing import Dict, Any, Tuple
+from typing import Callable, Dict, Any, List, Tuple
+from functools import lru_cache
 import os
+import re
 
 try:
     import yaml
+    try:
+        from yaml import CSafeLoader as _YamlLoader  # LibYAML 绑定，解析快一个数量级
+    except ImportError:
+        from yaml import SafeLoader as _YamlLoader
 except Exception:
     yaml = None
 from utils.logger import log_error
@@ -25,28 +31,54 @@ CATEGORY_W = {
 }
 
 
+# 类别判定规则：按优先级排列的前瞻分支，命中分支的命名组即为大类（lastgroup）
+_RAW_CAT_RE = re.compile(
+    r"(?=.*?(?:deadlock|race|thread|concurrency))(?P<concurrency>)"
+    r"|(?=.*?(?:use-after|double free|uaf))(?P<memory_safety>)"
+    r"|(?=.*?null)(?P<null_deref>)"
+    r"|(?=.*?overflow)(?P<buffer_overflow>)",
+    re.S,
+)
+_MSG_CAT_RE = re.compile(
+    r"(?=.*?(?:deadlock|lock order|atomic|tsan))(?P<concurrency>)"
+    r"|(?=.*?(?:use-after-free|double free|uaf))(?P<memory_safety>)"
+    r"|(?=.*?null)(?P<null_deref>)"
+    r"|(?=.*?overflow)(?P<buffer_overflow>)",
+    re.S,
+)
+
+
+@lru_cache(maxsize=4096)
 def _normalize_category(raw: str, message: str) -> str:
     """把各种工具的原生类别统一映射为高层大类"""
-    r = (raw or "").lower()
-    m = (message or "").lower()
-    if any(k in r for k in ("deadlock", "race", "thread", "concurrency")):
-        return "concurrency"
-    if "use-after" in r or "double free" in r or "uaf" in r:
-        return "memory_safety"
-    if "null" in r or "nullptr" in r or "null deref" in r:
-        return "null_deref"
-    if "overflow" in r:
-        return "buffer_overflow"
-    # 根据 message 再判断
-    if any(k in m for k in ("deadlock", "lock order", "atomic", "tsan")):
-        return "concurrency"
-    if any(k in m for k in ("use-after-free", "double free", "uaf")):
-        return "memory_safety"
-    if "null" in m or "nullptr" in m:
-        return "null_deref"
-    if "overflow" in m:
-        return "buffer_overflow"
-    return "other"
+    # 先看原生类别，未命中再根据 message 判断
+    m = _RAW_CAT_RE.match((raw or "").lower()) or _MSG_CAT_RE.match(
+        (message or "").lower()
+    )
+    return m.lastgroup if m else "other"
+
+
+def _issue_factors(issue: Dict[str, Any]) -> Tuple[str, str, int, int, bool, bool, int]:
+    """提取单个问题的评分因子（可哈希，供批量评分按组合去重）"""
+    sev = (issue.get("severity") or "medium").lower()
+    norm_cat = _normalize_category(
+        issue.get("category") or "", issue.get("message") or ""
+    )
+    depth = int(issue.get("call_depth") or 0)
+    on_critical_path = bool(issue.get("on_critical_path") or False)
+    dyn_confirmed = bool(issue.get("dynamic_confirmed") or False)
+    multi_tools = int(issue.get("detected_by_tools") or 1)
+
+    # 2) 影响范围
+    s_impact = min(10, max(0, depth * 2))
+    if on_critical_path:
+        s_impact += 5
+
+    # 3) 置信度
+    s_conf = (15 if dyn_confirmed else 0) + (
+        10 if multi_tools >= 2 else (5 if multi_tools == 1 else 0)
+    )
+    return sev, norm_cat, s_impact, s_conf, on_critical_path, dyn_confirmed, multi_tools
 
 
 class PriorityScorer:
@@ -58,38 +90,66 @@ class PriorityScorer:
         )
         self.weights = self._load_weights(cfg_path)
 
+        # 权重在实例生命周期内固定，预先把基础分与权重系数合并成查表
+        w = self.weights
+        sev_factor = w["severity"] / 40.0
+        cat_factor = w["category"] / 30.0
+        self._sev_table = {sev: base * sev_factor for sev, base in SEV_BASE.items()}
+        self._sev_default = 20 * sev_factor
+        self._cat_table = {cat: base * cat_factor for cat, base in CATEGORY_W.items()}
+        self._cat_default = self._cat_table["other"]
+        self._weigh = self._build_weigher(w["impact"] / 15.0, w["confidence"] / 15.0)
+
+    def _build_weigher(
+        self, impact_factor: float, conf_factor: float
+    ) -> Callable[[str, str, float, float], Tuple[float, float, float, float]]:
+        """按当前权重特化出加权函数：系数与查表作为闭包常量，评分时不再查 self.weights"""
+        sev_get, sev_default = self._sev_table.get, self._sev_default
+        cat_get, cat_default = self._cat_table.get, self._cat_default
+
+        def weigh(sev: str, cat: str, s_impact: float, s_conf: float):
+            return (
+                sev_get(sev, sev_default),
+                cat_get(cat, cat_default),
+                s_impact * impact_factor,
+                s_conf * conf_factor,
+            )
+
+        return weigh
+
     def score(
         self, issue: Dict[str, Any], context: Dict[str, Any]
     ) -> Tuple[float, Dict[str, float], str]:
-        sev = (issue.get("severity") or "medium").lower()
-        norm_cat = _normalize_category(
-            issue.get("category") or "", issue.get("message") or ""
-        )
-        depth = int(issue.get("call_depth") or 0)
-        on_critical_path = bool(issue.get("on_critical_path") or False)
-        dyn_confirmed = bool(issue.get("dynamic_confirmed") or False)
-        multi_tools = int(issue.get("detected_by_tools") or 1)
-
-        # 1) 基础分
-        s_sev = SEV_BASE.get(sev, 20)
-        s_cat = CATEGORY_W.get(norm_cat, CATEGORY_W["other"])
-
-        # 2) 影响范围
-        s_impact = min(10, max(0, depth * 2))
-        if on_critical_path:
-            s_impact += 5
-
-        # 3) 置信度
-        s_conf = (15 if dyn_confirmed else 0) + (
-            10 if multi_tools >= 2 else (5 if multi_tools == 1 else 0)
+        return self._score_factors(*_issue_factors(issue))
+
+    def score_batch(
+        self, issues: List[Dict[str, Any]], context: Dict[str, Any]
+    ) -> List[Tuple[float, Dict[str, float], str]]:
+        """
+        批量评分，结果与逐条调用 score() 一致
+
+        同一批问题的评分因子（严重度、类别、影响、置信度）组合高度重复，
+        按因子组合缓存加权/取整/理由的计算结果，每个组合只计算一次。
+        """
+        memo: Dict[tuple, Tuple[float, Dict[str, float], str]] = {}
+        results = []
+        for issue in issues:
+            factors = _issue_factors(issue)
+            scored = memo.get(factors)
+            if scored is None:
+                scored = memo[factors] = self._score_factors(*factors)
+            total, breakdown, reason = scored
+            results.append((total, dict(breakdown), reason))
+        return results
+
+    def _score_factors(
+        self, sev: str, norm_cat: str, s_impact: int, s_conf: int,
+        on_critical_path: bool, dyn_confirmed: bool, multi_tools: int,
+    ) -> Tuple[float, Dict[str, float], str]:
+        # 4) 加权汇总 - ✅ 修复: 先计算加权分数（系数已在 _build_weigher 中固化）
+        weighted_sev, weighted_cat, weighted_impact, weighted_conf = self._weigh(
+            sev, norm_cat, s_impact, s_conf
         )
-
-        # 4) 加权汇总 - ✅ 修复: 先计算加权分数
-        w = self.weights
-        weighted_sev = s_sev * (w["severity"] / 40.0)
-        weighted_cat = s_cat * (w["category"] / 30.0)
-        weighted_impact = s_impact * (w["impact"] / 15.0)
-        weighted_conf = s_conf * (w["confidence"] / 15.0)
         
         total = weighted_sev + weighted_cat + weighted_impact + weighted_conf
 
@@ -110,7 +170,7 @@ class PriorityScorer:
         if os.path.exists(path) and yaml is not None:
             try:
                 with open(path, "r", encoding="utf-8") as f:
-                    data = yaml.safe_load(f) or {}
+                    data = yaml.load(f, Loader=_YamlLoader) or {}
                 loaded_weights = data.get("weights", {})    
                 return {**DEFAULT_WEIGHTS, **data}
             except Exception as e:
@@ -5,13 +5,215 @@ btop专项检测器
 依赖：pattern_matcher、utils.logger
 调用关系：被DetectionAgent调用
 """
+import mmap
 import os
 import re
-from typing import Dict, List, Any
+from bisect import bisect_right
+from itertools import accumulate, chain
+from typing import Any, Callable, Dict, Iterator, List, Set, Tuple
 from .pattern_matcher import PatternMatcher, MemoryPatternMatcher
+from .process_pool import run_chunks
 from utils.logger import log_info, log_error
 
 
+def _make_issue(issue_type: str, severity: str, file_name: str, line_num: int,
+                line: str, message: str, suggestion: str) -> Dict[str, Any]:
+    """构造统一格式的问题记录"""
+    return {
+        'type': issue_type,
+        'severity': severity,
+        'file': file_name,
+        'line': line_num,
+        'code': line.strip(),
+        'message': message,
+        'suggestion': suggestion
+    }
+
+
+def _read_source(file_path: str) -> str:
+    """通过 mmap 只读映射文件并直接解码，省去中间的 bytes 读缓冲"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                code = str(view, 'utf-8', 'ignore')
+    # 与文本模式打开一致：统一换行符
+    if '\r' in code:
+        code = code.replace('\r\n', '\n').replace('\r', '\n')
+    return code
+
+
+def _prefetch_sources(file_paths: List[str]) -> None:
+    """提示内核预读整批文件（POSIX_FADV_WILLNEED），让多个文件的磁盘读取并发进行"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _line_starts(lines: List[str]) -> List[int]:
+    """计算每行在原文中的起始偏移，末尾附加哨兵（len(code) + 1）"""
+    starts = [0]
+    pos = 0
+    for line in lines:
+        pos += len(line) + 1
+        starts.append(pos)
+    return starts
+
+
+def _window_contains(lines: List[str], start: int, end: int, needles: Tuple[str, ...]) -> bool:
+    """判断行区间 [start, end) 内是否出现任一子串，逐行检查而不拼接上下文字符串"""
+    start = max(0, start)
+    end = min(len(lines), end)
+    return any(n in lines[i] for i in range(start, end) for n in needles)
+
+
+# 危险系统调用列表
+_SYSCALLS = (
+    'open', 'read', 'write', 'ioctl', 'sysctl',
+    'readdir', 'opendir', 'fopen', 'popen'
+)
+
+# 危险的格式化函数
+_DANGEROUS_FORMATS = ('sprintf', 'vsprintf', 'printf', 'fprintf')
+
+# 动态加载相关函数
+_DL_FUNCTIONS = ('dlopen', 'dlsym', 'LoadLibrary', 'GetProcAddress')
+
+# 各函数名合并为一条预编译的零宽前瞻，finditer 在每个位置尝试，
+# 对整个文件一次扫描即可找出全部命中（包括相互嵌套/重叠的调用）。
+# 字符类中排除换行，保证与逐行匹配的语义一致。
+_SYSCALL_RE = re.compile(r'(?=\b(%s)[^\S\n]*\([^)\n]*\))' % '|'.join(_SYSCALLS))
+_FORMAT_RE = re.compile(r'(?=(%s)[^\S\n]*\([^)\n]*%%[^"\'\n]*\))' % '|'.join(_DANGEROUS_FORMATS))
+_DL_RE = re.compile('(%s)' % '|'.join(_DL_FUNCTIONS))
+
+
+def _hits_by_line(regex: re.Pattern, code: str, line_starts: List[int]) -> Dict[int, Set[str]]:
+    """整文件 finditer，按行号（1 起）汇总第一个分组的命中；结果按行号升序"""
+    hits = {}
+    for m in regex.finditer(code):
+        line_num = bisect_right(line_starts, m.start())
+        found = hits.get(line_num)
+        if found is None:
+            hits[line_num] = {m.group(1)}
+        else:
+            found.add(m.group(1))
+    return hits
+
+# 逐行特征探针：每行只扫描一次，结果以前缀计数保存，供各检测项做区间查询
+_FEATURE_PROBES = {
+    'lock': re.compile(r'mutex|lock|atomic').search,
+    'bounds_check': re.compile(r'\.size\(\)|\.empty\(\)|\.at\(').search,
+    'empty_check': re.compile(r'\.empty\(\)|\.size\(\)').search,
+    'null_check': re.compile(r'nullptr|NULL|== 0').search,
+    'delete': re.compile(r'delete|free\(').search,
+    'smart_ptr': re.compile(r'unique_ptr|shared_ptr').search,
+    'error_check': re.compile(r'== -1|== NULL|== nullptr|!= 0|if \(|errno|perror|throw').search,
+    'fd_close': re.compile(r'\b(close|fclose|closedir)\s*\(').search,
+    'raii_stream': re.compile(r'ifstream|ofstream').search,
+}
+
+
+def _build_feature_table(lines: List[str]) -> Dict[str, List[int]]:
+    """一次线性扫描构建各特征的前缀计数数组（长度为 len(lines) + 1）"""
+    flags = {name: [] for name in _FEATURE_PROBES}
+    for line in lines:
+        for name, probe in _FEATURE_PROBES.items():
+            flags[name].append(1 if probe(line) else 0)
+    return {name: list(accumulate(f, initial=0)) for name, f in flags.items()}
+
+
+def _any_in(cum: List[int], start: int, end: int) -> bool:
+    """O(1) 判断行区间 [start, end) 内是否存在该特征"""
+    start = max(0, start)
+    end = min(len(cum) - 1, end)
+    return start < end and cum[end] - cum[start] > 0
+
+
+# 循环作用域扫描用的记号：注释与字符串字面量整体跳过，避免其中的括号干扰深度计数
+_SCOPE_TOKEN_RE = re.compile(
+    r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+    r'|\b(?:while|for)\s*\(|[{}();\n]',
+    re.S
+)
+
+
+def _loop_scope_lines(code: str, n_lines: int) -> List[bool]:
+    """
+    单遍扫描花括号/圆括号深度，标记每一行是否（部分）处于循环作用域内
+    
+    循环头之后若紧跟 {，循环体持续到与之匹配的 }；否则视为单语句循环体，
+    到顶层的 ; 结束。嵌套的花括号与循环均按栈正确处理。
+    """
+    in_loop = [False] * n_lines
+    line = 0
+    depth = 0           # 当前花括号深度
+    loop_stack = []     # 各循环体 { 所在的深度
+    header_parens = 0   # >0 表示正位于循环头的圆括号内
+    pending = False     # 循环头已结束，循环体尚未以 { 开始（单语句循环体）
+    line_active = False
+    
+    for m in _SCOPE_TOKEN_RE.finditer(code):
+        tok = m.group()
+        if tok == '\n' or tok.startswith('/*'):
+            for _ in range(tok.count('\n')):
+                if line < n_lines:
+                    in_loop[line] = line_active
+                line += 1
+                line_active = bool(loop_stack) or header_parens > 0 or pending
+            continue
+        
+        if tok == '{':
+            depth += 1
+            if pending:
+                loop_stack.append(depth)
+                pending = False
+        elif tok == '}':
+            if loop_stack and loop_stack[-1] == depth:
+                loop_stack.pop()
+            depth = max(0, depth - 1)
+        elif tok == '(':
+            if header_parens:
+                header_parens += 1
+        elif tok == ')':
+            if header_parens:
+                header_parens -= 1
+                if header_parens == 0:
+                    pending = True
+        elif tok == ';':
+            if not header_parens:
+                pending = False
+        elif tok[0] in 'wf':
+            # 循环头（记号以 '(' 结尾）
+            if not header_parens:
+                header_parens = 1
+            else:
+                header_parens += 1
+            # 关键字与 '(' 之间可能换行，需同步推进行号（循环头所在各行均属循环作用域）
+            for _ in range(tok.count('\n')):
+                if line < n_lines:
+                    in_loop[line] = True
+                line += 1
+            line_active = True
+        
+        if loop_stack or header_parens or pending:
+            line_active = True
+    
+    if line < n_lines:
+        in_loop[line] = line_active
+    return in_loop
+
+
 class BtopDetector:
     """btop项目专项检测器"""
     
@@ -56,39 +258,19 @@ class BtopDetector:
                     'files_analyzed': 0
                 }
             
-            # 2. 对每个文件执行专项检测
-            for file_path in btop_files:
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        code = f.read()
-                    
-                    file_issues = []
-                    
-                    # 检测1: 系统调用错误处理
-                    file_issues.extend(self._detect_syscall_errors(code, file_path))
-                    
-                    # 检测2: 字符串格式化安全
-                    file_issues.extend(self._detect_format_string_issues(code, file_path))
-                    
-                    # 检测3: 容器越界访问
-                    file_issues.extend(self._detect_container_bounds(code, file_path))
-                    
-                    # 检测4: 动态库加载风险
-                    file_issues.extend(self._detect_dynamic_loading_issues(code, file_path))
-                    
-                    # 检测5: 长时间运行的资源泄漏
-                    file_issues.extend(self._detect_longrun_leaks(code, file_path))
-                    
-                    # 检测6: 多线程数据竞争
-                    file_issues.extend(self._detect_data_races(code, file_path))
-                    
+            # 2. 对每个文件执行专项检测（文件间互不依赖，按块分发到进程池并行）
+            chunks = [btop_files[i:i + _FILES_PER_TASK]
+                      for i in range(0, len(btop_files), _FILES_PER_TASK)]
+            if len(chunks) == 1:
+                results = [_analyze_files(chunks[0])]
+            else:
+                results = await run_chunks(_analyze_files, chunks)
+            
+            for chunk_result in results:
+                for file_path, file_issues in chunk_result:
                     issues.extend(file_issues)
                     if file_issues:
                         files_analyzed.append(os.path.basename(file_path))
-                    
-                except Exception as e:
-                    log_error(f"分析文件失败 {file_path}: {str(e)}")
-                    continue
             
             log_info(f"btop检测完成，分析{len(files_analyzed)}个文件，发现{len(issues)}个问题")
             
@@ -110,6 +292,60 @@ class BtopDetector:
             log_error(f"btop检测异常: {str(e)}")
             return {'success': False, 'error': str(e), 'issues': []}
     
+    def _analyze_file(self, file_path: str) -> List[Dict[str, Any]]:
+        """对单个文件执行全部专项检测"""
+        code = _read_source(file_path)
+        
+        # 快速预筛：文件中不含任何触发关键字的检测项直接跳过
+        detectors = self._select_detectors(code, file_path)
+        if not detectors:
+            return []
+        
+        # 每个文件只切分一次行，并记录行首偏移，供各检测项共享
+        lines = code.split('\n')
+        line_starts = _line_starts(lines)
+        features = _build_feature_table(lines)
+        file_name = os.path.basename(file_path)
+        return list(chain.from_iterable(
+            detector(code, lines, line_starts, features, file_path, file_name)
+            for detector in detectors
+        ))
+    
+    def _select_detectors(self, code: str, file_path: str) -> List[Callable[..., Iterator[Dict[str, Any]]]]:
+        """
+        按各检测项的必要关键字对整个文件做子串预筛，返回需要执行的检测项
+        
+        每个条件都是对应检测项产生问题的必要条件，因此预筛不会漏报。
+        """
+        detectors = []
+        
+        # 检测1: 系统调用错误处理
+        if any(name in code for name in _SYSCALLS):
+            detectors.append(self._detect_syscall_errors)
+        
+        # 检测2: 字符串格式化安全
+        if 'printf' in code and '%' in code and ('fmt' in code or 'format' in code):
+            detectors.append(self._detect_format_string_issues)
+        
+        # 检测3: 容器越界访问
+        if '[' in code or '.back()' in code or '.front()' in code:
+            detectors.append(self._detect_container_bounds)
+        
+        # 检测4: 动态库加载风险
+        if (any(func in code for func in _DL_FUNCTIONS)
+                or ('sizeof' in code and ('rsmi' in code or 'rocm' in file_path.lower()))):
+            detectors.append(self._detect_dynamic_loading_issues)
+        
+        # 检测5: 长时间运行的资源泄漏
+        if 'new' in code or 'malloc' in code or 'open' in code:
+            detectors.append(self._detect_longrun_leaks)
+        
+        # 检测6: 多线程数据竞争
+        if ('static' in code or 'extern' in code) and 'thread' in code.lower():
+            detectors.append(self._detect_data_races)
+        
+        return detectors
+    
     def _find_btop_files(self, project_path: str) -> List[str]:
         """查找btop相关文件"""
         btop_files = []
@@ -124,220 +360,144 @@ class BtopDetector:
         
         return btop_files
     
-    def _detect_syscall_errors(self, code: str, file_path: str) -> List[Dict[str, Any]]:
+    def _detect_syscall_errors(self, code: str, lines: List[str], line_starts: List[int],
+                               features: Dict[str, List[int]], file_path: str,
+                               file_name: str) -> Iterator[Dict[str, Any]]:
         """检测系统调用错误处理（btop历史bug重点）"""
-        issues = []
-        lines = code.split('\n')
-        
-        # 危险系统调用列表
-        syscalls = [
-            'open', 'read', 'write', 'ioctl', 'sysctl',
-            'readdir', 'opendir', 'fopen', 'popen'
-        ]
-        
-        for line_num, line in enumerate(lines, 1):
-            for syscall in syscalls:
-                # 匹配系统调用但未检查返回值
-                pattern = rf'\b{syscall}\s*\([^)]*\)'
-                if re.search(pattern, line):
-                    # 检查后续几行是否有错误检查
-                    context = '\n'.join(lines[line_num:min(len(lines), line_num+3)])
-                    
-                    has_check = any(keyword in context for keyword in [
-                        '== -1', '== NULL', '== nullptr', '!= 0', 
-                        'if (', 'errno', 'perror', 'throw'
-                    ])
-                    
-                    if not has_check and '//' not in line:
-                        issues.append({
-                            'type': 'syscall_error_handling',
-                            'severity': 'high',
-                            'file': os.path.basename(file_path),
-                            'line': line_num,
-                            'code': line.strip(),
-                            'message': f'系统调用 {syscall}() 可能未检查返回值',
-                            'suggestion': f'检查{syscall}的返回值并处理错误（参考errno）'
-                        })
-        
-        return issues
+        # 整个文件一次扫描，按行汇总命中的系统调用
+        for line_num, found in _hits_by_line(_SYSCALL_RE, code, line_starts).items():
+            line = lines[line_num - 1]
+            if '//' in line:
+                continue
+            
+            # 检查后续几行是否有错误检查
+            if _any_in(features['error_check'], line_num, line_num + 3):
+                continue
+            
+            for syscall in _SYSCALLS:
+                if syscall in found:
+                    yield _make_issue(
+                        'syscall_error_handling', 'high', file_name, line_num, line,
+                        f'系统调用 {syscall}() 可能未检查返回值',
+                        f'检查{syscall}的返回值并处理错误（参考errno）'
+                    )
     
-    def _detect_format_string_issues(self, code: str, file_path: str) -> List[Dict[str, Any]]:
+    def _detect_format_string_issues(self, code: str, lines: List[str], line_starts: List[int],
+                                     features: Dict[str, List[int]], file_path: str,
+                                     file_name: str) -> Iterator[Dict[str, Any]]:
         """检测字符串格式化安全问题"""
-        issues = []
-        lines = code.split('\n')
-        
-        # 危险的格式化函数
-        dangerous_formats = ['sprintf', 'vsprintf', 'printf', 'fprintf']
-        
-        for line_num, line in enumerate(lines, 1):
-            for func in dangerous_formats:
-                pattern = rf'{func}\s*\([^)]*%[^"\']*\)'
-                if re.search(pattern, line):
-                    # 检查是否使用了变量作为格式字符串
-                    if 'fmt' in line or 'format' in line:
-                        issues.append({
-                            'type': 'format_string_vulnerability',
-                            'severity': 'high',
-                            'file': os.path.basename(file_path),
-                            'line': line_num,
-                            'code': line.strip(),
-                            'message': f'{func}使用变量格式字符串，可能导致安全漏洞',
-                            'suggestion': f'使用std::format或snprintf，确保格式字符串为常量'
-                        })
-        
-        return issues
+        for line_num, found in _hits_by_line(_FORMAT_RE, code, line_starts).items():
+            # 检查是否使用了变量作为格式字符串
+            line = lines[line_num - 1]
+            if 'fmt' not in line and 'format' not in line:
+                continue
+            
+            for func in _DANGEROUS_FORMATS:
+                if func in found:
+                    yield _make_issue(
+                        'format_string_vulnerability', 'high', file_name, line_num, line,
+                        f'{func}使用变量格式字符串，可能导致安全漏洞',
+                        f'使用std::format或snprintf，确保格式字符串为常量'
+                    )
     
-    def _detect_container_bounds(self, code: str, file_path: str) -> List[Dict[str, Any]]:
+    def _detect_container_bounds(self, code: str, lines: List[str], line_starts: List[int],
+                                 features: Dict[str, List[int]], file_path: str,
+                                 file_name: str) -> Iterator[Dict[str, Any]]:
         """检测容器越界访问（btop常见crash原因）"""
-        issues = []
-        lines = code.split('\n')
-        
         for line_num, line in enumerate(lines, 1):
             # 检测operator[]访问但未检查size
             if re.search(r'\w+\[\s*\w+\s*\]', line) and 'string' not in line:
                 context_start = max(0, line_num - 5)
-                context = '\n'.join(lines[context_start:line_num])
                 
                 # 检查是否有.size()或.empty()检查
-                has_bounds_check = bool(re.search(r'\.size\(\)|\.empty\(\)|\.at\(', context))
+                has_bounds_check = _any_in(features['bounds_check'], context_start, line_num)
                 
-                if not has_bounds_check and 'for' not in context:
-                    issues.append({
-                        'type': 'container_bounds',
-                        'severity': 'high',
-                        'file': os.path.basename(file_path),
-                        'line': line_num,
-                        'code': line.strip(),
-                        'message': '容器下标访问可能越界',
-                        'suggestion': '使用.at()替代[]或先检查size()'
-                    })
+                if not has_bounds_check and not _window_contains(lines, context_start, line_num, ('for',)):
+                    yield _make_issue(
+                        'container_bounds', 'high', file_name, line_num, line,
+                        '容器下标访问可能越界',
+                        '使用.at()替代[]或先检查size()'
+                    )
         
         # 检测vector/deque的back()/front()调用
         for line_num, line in enumerate(lines, 1):
             if re.search(r'\.(back|front)\(\)', line):
-                context = '\n'.join(lines[max(0, line_num-3):line_num])
-                
-                if not re.search(r'\.empty\(\)|\.size\(\)', context):
-                    issues.append({
-                        'type': 'container_empty_access',
-                        'severity': 'critical',
-                        'file': os.path.basename(file_path),
-                        'line': line_num,
-                        'code': line.strip(),
-                        'message': '调用back()/front()前可能未检查容器是否为空',
-                        'suggestion': '在调用前使用if (!container.empty())检查'
-                    })
-        
-        return issues
+                if not _any_in(features['empty_check'], line_num - 3, line_num):
+                    yield _make_issue(
+                        'container_empty_access', 'critical', file_name, line_num, line,
+                        '调用back()/front()前可能未检查容器是否为空',
+                        '在调用前使用if (!container.empty())检查'
+                    )
     
-    def _detect_dynamic_loading_issues(self, code: str, file_path: str) -> List[Dict[str, Any]]:
+    def _detect_dynamic_loading_issues(self, code: str, lines: List[str], line_starts: List[int],
+                                       features: Dict[str, List[int]], file_path: str,
+                                       file_name: str) -> Iterator[Dict[str, Any]]:
         """检测动态库加载问题（ROCm等）"""
-        issues = []
-        lines = code.split('\n')
-        
-        # 动态加载相关函数
-        dl_functions = ['dlopen', 'dlsym', 'LoadLibrary', 'GetProcAddress']
-        
-        for line_num, line in enumerate(lines, 1):
-            for func in dl_functions:
-                if func in line:
-                    context = '\n'.join(lines[line_num:min(len(lines), line_num+5)])
-                    
-                    # 检查是否有NULL/nullptr检查
-                    has_null_check = 'nullptr' in context or 'NULL' in context or '== 0' in context
-                    
-                    if not has_null_check:
-                        issues.append({
-                            'type': 'dynamic_loading',
-                            'severity': 'high',
-                            'file': os.path.basename(file_path),
-                            'line': line_num,
-                            'code': line.strip(),
-                            'message': f'{func}返回值未检查，可能导致崩溃',
-                            'suggestion': '检查dlopen/dlsym返回值，处理库不存在的情况'
-                        })
+        for line_num, found in _hits_by_line(_DL_RE, code, line_starts).items():
+            # 检查是否有NULL/nullptr检查
+            if _any_in(features['null_check'], line_num, line_num + 5):
+                continue
+            
+            line = lines[line_num - 1]
+            for func in _DL_FUNCTIONS:
+                if func in found:
+                    yield _make_issue(
+                        'dynamic_loading', 'high', file_name, line_num, line,
+                        f'{func}返回值未检查，可能导致崩溃',
+                        '检查dlopen/dlsym返回值，处理库不存在的情况'
+                    )
         
         # 检测结构体版本不匹配（ROCm bug）
         if 'rocm' in file_path.lower() or 'rsmi' in code:
             for line_num, line in enumerate(lines, 1):
                 if 'sizeof' in line and 'struct' in line:
-                    issues.append({
-                        'type': 'struct_version_mismatch',
-                        'severity': 'medium',
-                        'file': os.path.basename(file_path),
-                        'line': line_num,
-                        'code': line.strip(),
-                        'message': 'ROCm结构体可能存在版本不匹配',
-                        'suggestion': '添加版本检查或使用rsmi_version_get()验证兼容性'
-                    })
-        
-        return issues
+                    yield _make_issue(
+                        'struct_version_mismatch', 'medium', file_name, line_num, line,
+                        'ROCm结构体可能存在版本不匹配',
+                        '添加版本检查或使用rsmi_version_get()验证兼容性'
+                    )
     
-    def _detect_longrun_leaks(self, code: str, file_path: str) -> List[Dict[str, Any]]:
+    def _detect_longrun_leaks(self, code: str, lines: List[str], line_starts: List[int],
+                              features: Dict[str, List[int]], file_path: str,
+                              file_name: str) -> Iterator[Dict[str, Any]]:
         """检测长时间运行的资源泄漏（btop特有问题）"""
-        issues = []
-        lines = code.split('\n')
-        
-        # 检测循环中的资源分配
-        in_loop = False
-        loop_start = 0
+        # 检测循环中的资源分配（按花括号深度判断每行是否处于循环体内）
+        in_loop = _loop_scope_lines(code, len(lines))
         
         for line_num, line in enumerate(lines, 1):
-            # 检测循环开始
-            if re.search(r'\b(while|for)\s*\(', line):
-                in_loop = True
-                loop_start = line_num
+            if not in_loop[line_num - 1]:
+                continue
             
-            if in_loop:
-                # 在循环中查找new/malloc但没有对应的delete/free
-                if re.search(r'\bnew\s+\w+|malloc\s*\(', line):
-                    # 查找后续是否有释放
-                    context = '\n'.join(lines[line_num:min(len(lines), line_num+50)])
-                    
-                    has_delete = 'delete' in context or 'free(' in context
-                    uses_smart_ptr = 'unique_ptr' in context or 'shared_ptr' in context
-                    
-                    if not (has_delete or uses_smart_ptr):
-                        issues.append({
-                            'type': 'loop_memory_leak',
-                            'severity': 'critical',
-                            'file': os.path.basename(file_path),
-                            'line': line_num,
-                            'code': line.strip(),
-                            'message': '循环中分配内存可能泄漏（长时间运行累积）',
-                            'suggestion': '使用智能指针或确保在循环内释放'
-                        })
+            # 在循环中查找new/malloc但没有对应的delete/free
+            if re.search(r'\bnew\s+\w+|malloc\s*\(', line):
+                # 查找后续是否有释放
+                has_delete = _any_in(features['delete'], line_num, line_num + 50)
+                uses_smart_ptr = _any_in(features['smart_ptr'], line_num, line_num + 50)
                 
-                # 检测循环结束
-                if line.strip() == '}':
-                    in_loop = False
+                if not (has_delete or uses_smart_ptr):
+                    yield _make_issue(
+                        'loop_memory_leak', 'critical', file_name, line_num, line,
+                        '循环中分配内存可能泄漏（长时间运行累积）',
+                        '使用智能指针或确保在循环内释放'
+                    )
         
         # 检测文件描述符泄漏
         for line_num, line in enumerate(lines, 1):
             if re.search(r'\b(open|fopen|opendir)\s*\(', line):
-                context = '\n'.join(lines[line_num:min(len(lines), line_num+30)])
-                
-                has_close = bool(re.search(r'\b(close|fclose|closedir)\s*\(', context))
-                uses_raii = 'ifstream' in context or 'ofstream' in context
+                has_close = _any_in(features['fd_close'], line_num, line_num + 30)
+                uses_raii = _any_in(features['raii_stream'], line_num, line_num + 30)
                 
                 if not (has_close or uses_raii):
-                    issues.append({
-                        'type': 'fd_leak',
-                        'severity': 'high',
-                        'file': os.path.basename(file_path),
-                        'line': line_num,
-                        'code': line.strip(),
-                        'message': '文件描述符可能泄漏',
-                        'suggestion': '使用RAII（ifstream）或确保在所有路径close'
-                    })
-        
-        return issues
+                    yield _make_issue(
+                        'fd_leak', 'high', file_name, line_num, line,
+                        '文件描述符可能泄漏',
+                        '使用RAII（ifstream）或确保在所有路径close'
+                    )
     
-    def _detect_data_races(self, code: str, file_path: str) -> List[Dict[str, Any]]:
+    def _detect_data_races(self, code: str, lines: List[str], line_starts: List[int],
+                           features: Dict[str, List[int]], file_path: str,
+                           file_name: str) -> Iterator[Dict[str, Any]]:
         """检测多线程数据竞争"""
-        issues = []
-        lines = code.split('\n')
-        
         # 检测全局/静态变量在多线程中访问
         global_vars = []
         for line_num, line in enumerate(lines, 1):
@@ -347,22 +507,38 @@ class BtopDetector:
                     global_vars.append((var_match.group(2), line_num))
         
         # 检测这些变量是否在没有锁保护的情况下被修改
+        uses_thread = 'thread' in code.lower()
         for var_name, def_line in global_vars:
             for line_num, line in enumerate(lines, 1):
                 if var_name in line and '=' in line and line_num != def_line:
-                    context = '\n'.join(lines[max(0, line_num-5):line_num+2])
-                    
-                    has_lock = bool(re.search(r'mutex|lock|atomic', context))
+                    has_lock = _any_in(features['lock'], line_num - 5, line_num + 2)
                     
-                    if not has_lock and 'thread' in code.lower():
-                        issues.append({
-                            'type': 'data_race',
-                            'severity': 'critical',
-                            'file': os.path.basename(file_path),
-                            'line': line_num,
-                            'code': line.strip(),
-                            'message': f'全局变量{var_name}可能存在数据竞争',
-                            'suggestion': '使用std::mutex或std::atomic保护共享数据'
-                        })
-        
-        return issues
+                    if not has_lock and uses_thread:
+                        yield _make_issue(
+                            'data_race', 'critical', file_name, line_num, line,
+                            f'全局变量{var_name}可能存在数据竞争',
+                            '使用std::mutex或std::atomic保护共享数据'
+                        )
+
+
+# 每个进程池任务处理的文件数，摊薄参数/结果的序列化开销
+_FILES_PER_TASK = 8
+
+# 工作进程内复用的检测器实例
+_worker_detector = None
+
+
+def _analyze_files(file_paths: List[str]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """进程池任务入口：依次检测一组文件，返回 (文件路径, 问题列表)"""
+    global _worker_detector
+    if _worker_detector is None:
+        _worker_detector = BtopDetector()
+    
+    _prefetch_sources(file_paths)
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append((file_path, _worker_detector._analyze_file(file_path)))
+        except Exception as e:
+            log_error(f"分析文件失败 {file_path}: {str(e)}")
+    return results
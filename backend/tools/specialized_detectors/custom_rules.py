@@ -6,11 +6,160 @@
 """
 import os
 import re
+import sys
 import json
-from typing import Dict, List, Any
-from .pattern_matcher import PatternMatcher
+import tempfile
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Any, NamedTuple, Optional, Sequence, Tuple
+from .pattern_matcher import PatternMatcher, extract_required_literal
+from .file_walker import iter_files
+from .process_pool import run_chunks
+from .source_cache import FileIssueCache, content_digest, read_source
+from config import settings
 from utils.logger import log_info, log_error, log_warning
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+
+# 参与自定义规则检测的源文件扩展名
+_SOURCE_EXTENSIONS = ('.cpp', '.c', '.h', '.hpp')
+
+# 不进入的构建输出目录（隐藏目录同样跳过）
+_SKIP_DIRS = frozenset(('build', 'cmake-build-debug'))
+
+
+def _skip_dir(name: str) -> bool:
+    """遍历时是否跳过该目录"""
+    return name.startswith('.') or name in _SKIP_DIRS
+
+
+# 行边界语义与整段扫描不一致的构造（反向引用、\A/\Z、否定环视），含这些构造的规则不参与合并预扫描
+_UNSAFE_MASTER_RE = re.compile(r'\\[1-9AZ]|\(\?P=|\(\?<?!')
+
+
+def _ext_key(file_path: str) -> str:
+    """文件名中最后一个'.'起的后缀（无'.'时为空串），用于查规则索引"""
+    name = os.path.basename(file_path)
+    dot = name.rfind('.')
+    return name[dot:] if dot != -1 else ''
+
+
+def _index_rules(rules: Sequence['CustomRule']) -> Optional[Dict[str, Tuple['CustomRule', ...]]]:
+    """
+    按扩展名建立规则索引（每个扩展名下保持规则原有顺序）
+
+    只有形如'.cpp'的普通扩展名能由 _ext_key 精确查找；
+    存在'.test.cpp'之类的扩展名时返回None，由调用方逐条规则判断
+    """
+    by_ext = defaultdict(list)
+    for rule in rules:
+        for ext in set(rule.file_extensions):
+            if not ext.startswith('.') or ext.count('.') != 1 or '/' in ext or os.sep in ext:
+                return None
+            by_ext[ext].append(rule)
+    return {ext: tuple(ext_rules) for ext, ext_rules in by_ext.items()}
+
+
+@lru_cache(maxsize=1024)
+def _get_regex(pattern: str) -> re.Pattern:
+    """编译规则正则（按模式字符串缓存，多个规则文件中的重复模式共享同一对象）"""
+    return re.compile(pattern)
+
+
+@lru_cache(maxsize=256)
+def _compile_master(patterns: Tuple[str, ...]) -> Optional[re.Pattern]:
+    """
+    将多条规则合并为一个交替正则，用于整个文件缓冲区的单次预扫描
+
+    预扫描只负责找出可能命中的行，命中行再逐条规则精确匹配，
+    因此交替分支之间互相遮挡不会造成漏报。无法安全合并时返回None（逐行全量检查）
+    """
+    if any(_UNSAFE_MASTER_RE.search(p) for p in patterns):
+        return None
+    try:
+        return re.compile('|'.join('(?:%s)' % p for p in patterns), re.MULTILINE)
+    except re.error:
+        return None
+
+
+class Issue(NamedTuple):
+    """
+    单条规则命中（紧凑的不可变记录）
+    
+    扫描、进程间回传与结果缓存均使用该记录，仅在 detect()/check() 返回前
+    通过 _issue_dict() 转为问题字典，字段顺序即问题字典的键顺序
+    """
+    type: str
+    rule_id: str
+    rule_name: str
+    severity: str
+    file: str
+    line: int
+    code: str
+    message: str
+    suggestion: str
+    matched_text: str
+
+
+# 问题中的元数据字段：同值字符串驻留为同一对象，减少内存并使比较退化为指针比较
+_INTERNED_FIELDS = ('type', 'rule_id', 'rule_name', 'severity', 'file', 'message', 'suggestion')
+
+
+def _issue_dict(hit: Issue) -> Dict[str, Any]:
+    """
+    规则命中转为问题字典，元数据字符串驻留
+    
+    工作进程回传的记录经反序列化后，各块的同值字符串是不同对象，驻留后全部共享
+    """
+    issue = hit._asdict()
+    for key in _INTERNED_FIELDS:
+        issue[key] = sys.intern(issue[key])
+    return issue
+
+
+def _scan_rules(
+    code: str,
+    file_path: str,
+    rules: Sequence['CustomRule'],
+    master: Optional[re.Pattern]
+) -> List[Issue]:
+    """用合并正则预扫描整个文件，再对候选行逐条规则匹配（结果顺序与逐规则逐行一致）"""
+    lines = code.split('\n')
+    
+    if master is None:
+        candidates = range(len(lines))
+    else:
+        line_starts = [0]
+        for line in lines:
+            line_starts.append(line_starts[-1] + len(line) + 1)
+        hit_lines = set()
+        for m in master.finditer(code):
+            first = bisect_right(line_starts, m.start()) - 1
+            last = bisect_right(line_starts, max(m.start(), m.end() - 1)) - 1
+            hit_lines.update(range(first, last + 1))
+        candidates = sorted(hit_lines)
+    
+    issues = []
+    file_name = sys.intern(os.path.basename(file_path))
+    for rule in rules:
+        search = rule.pattern.search
+        for idx in candidates:
+            match = search(lines[idx])
+            if match:
+                issues.append(Issue(
+                    'custom_rule', rule.rule_id, rule.name, rule.severity, file_name,
+                    idx + 1, lines[idx].strip(), rule.message, rule.suggestion,
+                    match.group(0)
+                ))
+    
+    return issues
+
 
 class CustomRule:
     """单个自定义规则"""
@@ -24,43 +173,48 @@ class CustomRule:
         severity: str,
         message: str,
         suggestion: str,
-        file_extensions: List[str] = None
+        file_extensions: List[str] = None,
+        required_literal: Optional[str] = None
     ):
         self.rule_id = rule_id
         self.name = name
         self.description = description
-        self.pattern = re.compile(pattern)
+        # 正则在首次访问 pattern 时才编译，被 enabled_rules 过滤掉的规则不付出编译开销
+        self.pattern_src = pattern
+        self._pattern = None
         self.severity = severity
         self.message = message
         self.suggestion = suggestion
         self.file_extensions = file_extensions or ['.cpp', '.h', '.hpp', '.c']
+        # 匹配必然包含的字面量（可在规则文件中显式指定），用于整文件快速预筛
+        self.required_literal = required_literal or extract_required_literal(pattern)
     
     def check(self, code: str, file_path: str) -> List[Dict[str, Any]]:
         """检查代码是否匹配规则"""
-        issues = []
-        
         # 检查文件扩展名
-        if not any(file_path.endswith(ext) for ext in self.file_extensions):
-            return issues
+        if not self.applies_to(file_path):
+            return []
         
-        lines = code.split('\n')
-        for line_num, line in enumerate(lines, 1):
-            match = self.pattern.search(line)
-            if match:
-                issues.append({
-                    'type': 'custom_rule',
-                    'rule_id': self.rule_id,
-                    'rule_name': self.name,
-                    'severity': self.severity,
-                    'file': os.path.basename(file_path),
-                    'line': line_num,
-                    'code': line.strip(),
-                    'message': self.message,
-                    'suggestion': self.suggestion,
-                    'matched_text': match.group(0)
-                })
+        if not self.may_match(code):
+            return []
         
-        return issues
+        hits = _scan_rules(code, file_path, (self,), _compile_master((self.pattern_src,)))
+        return [_issue_dict(hit) for hit in hits]
+    
+    @property
+    def pattern(self) -> re.Pattern:
+        """编译后的规则正则（惰性编译）"""
+        if self._pattern is None:
+            self._pattern = _get_regex(self.pattern_src)
+        return self._pattern
+    
+    def applies_to(self, file_path: str) -> bool:
+        """规则是否适用于该文件"""
+        return file_path.endswith(tuple(self.file_extensions))
+    
+    def may_match(self, code: str) -> bool:
+        """字面量预筛：代码中不含必需字面量时规则不可能命中"""
+        return self.required_literal is None or self.required_literal in code
 
 
 class CustomRulesEngine:
@@ -84,6 +238,12 @@ class CustomRulesEngine:
         
         # 加载用户自定义规则
         self._load_user_rules()
+        
+        # 扩展名 -> 适用规则，每个文件只需一次字典查找
+        self._rules_by_ext = _index_rules(self.rules)
+        
+        # 单文件结果缓存：内容与激活规则均未变化的文件不再重复扫描
+        self._issue_cache = FileIssueCache('custom_rules')
     
     def _load_builtin_rules(self):
         """加载内置规则"""
@@ -153,8 +313,9 @@ class CustomRulesEngine:
             return
         
         try:
-            with open(rules_file, 'r', encoding='utf-8') as f:
-                user_rules_data = json.load(f)
+            with open(rules_file, 'rb') as f:
+                raw = f.read()
+            user_rules_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
             
             for rule_data in user_rules_data.get('rules', []):
                 try:
@@ -166,7 +327,8 @@ class CustomRulesEngine:
                         severity=rule_data.get('severity', 'medium'),
                         message=rule_data['message'],
                         suggestion=rule_data.get('suggestion', ''),
-                        file_extensions=rule_data.get('file_extensions', ['.cpp', '.h'])
+                        file_extensions=rule_data.get('file_extensions', ['.cpp', '.h']),
+                        required_literal=rule_data.get('required_literal')
                     )
                     self.rules.append(rule)
                     log_info(f"加载用户规则: {rule.name}")
@@ -209,54 +371,332 @@ class CustomRulesEngine:
         try:
             log_info("开始自定义规则检测")
             
-            active_rules = self.rules
-            if enabled_rules:
-                active_rules = [r for r in self.rules if r.rule_id in enabled_rules]
+            active_rules, rules_by_ext = self._activate_rules(enabled_rules)
             
-            log_info(f"激活 {len(active_rules)} 条规则")
+            file_paths = [
+                entry.path for entry in iter_files(project_path, _skip_dir)
+                if entry.name.endswith(_SOURCE_EXTENSIONS)
+            ]
+            file_results = await self._scan_paths(file_paths, active_rules, rules_by_ext)
             
-            issues = []
-            files_analyzed = []
+            return self._build_result(active_rules, file_results)
             
-            for root, dirs, files in os.walk(project_path):
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['build', 'cmake-build-debug']]
-                
-                for file in files:
-                    if any(file.endswith(ext) for ext in ['.cpp', '.c', '.h', '.hpp']):
-                        file_path = os.path.join(root, file)
-                        
-                        try:
-                            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                code = f.read()
-                            
-                            for rule in active_rules:
-                                rule_issues = rule.check(code, file_path)
-                                issues.extend(rule_issues)
-                            
-                            if issues:
-                                files_analyzed.append(os.path.basename(file_path))
-                        
-                        except Exception as e:
-                            log_warning(f"读取文件失败 {file_path}: {str(e)}")
-                            continue
+        except Exception as e:
+            log_error(f"自定义规则检测异常: {str(e)}")
+            return {'success': False, 'error': str(e), 'issues': []}
+    
+    async def detect_incremental(
+        self,
+        project_path: str,
+        changed_files: List[str] = None,
+        enabled_rules: List[str] = None
+    ) -> Dict[str, Any]:
+        """
+        增量检测：只重新扫描变更的文件，其余文件复用上次的结果
+        
+        上次结果持久化在结果目录下（按项目路径区分，不写入项目目录），按相对路径记录
+        mtime、大小与问题列表。文件列表与 detect() 相同方式遍历（只读目录项），
+        重新扫描 changed_files、新文件以及 mtime/大小已变化的文件；规则配置变化或
+        缓存缺失时全部重扫。结果的文件顺序与 detect() 一致。
+        
+        Args:
+            project_path: 项目根目录
+            changed_files: 需强制重扫的文件（绝对路径或相对 project_path 的路径）
+            enabled_rules: 启用的规则ID列表，默认全部
+        """
+        try:
+            log_info(f"开始自定义规则增量检测，指定变更文件{len(changed_files or [])}个")
             
-            log_info(f"自定义规则检测完成，发现{len(issues)}个问题")
+            active_rules, rules_by_ext = self._activate_rules(enabled_rules)
+            rules_hash = content_digest(repr(self._rules_version(active_rules)))
             
-            return {
-                'success': True,
-                'tool': 'custom_rules',
-                'rules_applied': len(active_rules),
-                'issues': issues,
-                'files_analyzed': list(set(files_analyzed)),
-                'summary': {
-                    'total_issues': len(issues),
-                    'critical': len([i for i in issues if i['severity'] == 'critical']),
-                    'high': len([i for i in issues if i['severity'] == 'high']),
-                    'medium': len([i for i in issues if i['severity'] == 'medium']),
-                    'low': len([i for i in issues if i['severity'] == 'low'])
-                }
+            cache_path = _incremental_cache_path(project_path)
+            entries = _load_incremental_cache(cache_path, rules_hash) or {}
+            
+            file_paths = [
+                entry.path for entry in iter_files(project_path, _skip_dir)
+                if entry.name.endswith(_SOURCE_EXTENSIONS)
+            ]
+            rel_paths = {file_path: os.path.relpath(file_path, project_path) for file_path in file_paths}
+            stamps = {file_path: _file_stamp(file_path) for file_path in file_paths}
+            forced = {
+                os.path.normpath(os.path.join(project_path, file_path))
+                for file_path in changed_files or ()
             }
             
+            rescan = [
+                file_path for file_path in file_paths
+                if os.path.normpath(file_path) in forced
+                or rel_paths[file_path] not in entries
+                or entries[rel_paths[file_path]]['stamp'] != stamps[file_path]
+            ]
+            rescan_set = set(rescan)
+            scanned = dict(await self._scan_paths(rescan, active_rules, rules_by_ext))
+            
+            # 按遍历顺序合并本次扫描与缓存结果；已删除的文件不再出现
+            new_entries = {}
+            file_results = []
+            for file_path in file_paths:
+                rel_path = rel_paths[file_path]
+                if file_path in scanned:
+                    file_issues = scanned[file_path]
+                    if stamps[file_path] is not None:
+                        new_entries[rel_path] = {'stamp': stamps[file_path], 'issues': file_issues}
+                elif file_path not in rescan_set and rel_path in entries:
+                    file_issues = entries[rel_path]['issues']
+                    new_entries[rel_path] = entries[rel_path]
+                else:
+                    # 读取失败的文件与 detect() 一样跳过
+                    continue
+                file_results.append((file_path, file_issues))
+            
+            _save_incremental_cache(cache_path, project_path, rules_hash, new_entries)
+            _prune_incremental_caches(os.path.dirname(cache_path))
+            log_info(f"增量检测重新扫描了{len(scanned)}个文件")
+            
+            return self._build_result(active_rules, file_results)
+            
         except Exception as e:
-            log_error(f"自定义规则检测异常: {str(e)}")
+            log_error(f"自定义规则增量检测异常: {str(e)}")
             return {'success': False, 'error': str(e), 'issues': []}
+    
+    def _activate_rules(
+        self, enabled_rules: Optional[List[str]]
+    ) -> Tuple[List[CustomRule], Optional[Dict[str, Tuple[CustomRule, ...]]]]:
+        """确定本次检测的激活规则及其扩展名索引，并按规则版本设置结果缓存"""
+        active_rules = self.rules
+        if enabled_rules:
+            active_rules = [r for r in self.rules if r.rule_id in enabled_rules]
+        
+        # 只编译实际启用的规则；正则无效的规则记录错误后跳过
+        valid_rules = []
+        for rule in active_rules:
+            try:
+                rule.pattern
+            except re.error as e:
+                log_error(f"规则 {rule.rule_id} 的正则无效，已跳过: {str(e)}")
+                continue
+            valid_rules.append(rule)
+        
+        if len(valid_rules) == len(self.rules):
+            rules_by_ext = self._rules_by_ext
+        else:
+            active_rules = valid_rules
+            rules_by_ext = _index_rules(active_rules)
+        
+        log_info(f"激活 {len(active_rules)} 条规则")
+        self._issue_cache.set_version(self._rules_version(active_rules))
+        return active_rules, rules_by_ext
+    
+    @staticmethod
+    def _rules_version(rules: List[CustomRule]) -> Tuple:
+        """影响检测结果的全部规则配置"""
+        return tuple(
+            (r.rule_id, r.name, r.pattern_src, r.severity, r.message,
+             r.suggestion, tuple(r.file_extensions), r.required_literal)
+            for r in rules
+        )
+    
+    async def _scan_paths(
+        self,
+        file_paths: List[str],
+        active_rules: List[CustomRule],
+        rules_by_ext: Optional[Dict[str, Tuple[CustomRule, ...]]]
+    ) -> List[Tuple[str, List[Issue]]]:
+        """扫描给定文件，返回 (文件路径, 规则命中列表)；读取失败的文件不出现在结果中"""
+        # (文件路径, 已缓存结果的内容摘要)
+        tasks = [(file_path, self._issue_cache.known_digest(file_path)) for file_path in file_paths]
+        
+        # 文件间互不依赖，按块分发到共享进程池并行扫描；激活规则随任务下发
+        chunks = [tasks[i:i + _FILES_PER_TASK]
+                  for i in range(0, len(tasks), _FILES_PER_TASK)]
+        if len(chunks) <= 1:
+            results = [_scan_files(chunk, active_rules, rules_by_ext) for chunk in chunks]
+        else:
+            results = await run_chunks(_scan_files, chunks, active_rules, rules_by_ext)
+        
+        file_results = []
+        for chunk_result in results:
+            for file_path, digest, file_issues in chunk_result:
+                # 内容摘要与缓存一致时任务不返回结果，直接复用缓存
+                if file_issues is None:
+                    file_issues = self._issue_cache.get(file_path)
+                else:
+                    self._issue_cache.put(file_path, digest, file_issues)
+                file_results.append((file_path, file_issues))
+        return file_results
+    
+    def _build_result(
+        self, active_rules: List[CustomRule], file_results: List[Tuple[str, List[Issue]]]
+    ) -> Dict[str, Any]:
+        """汇总各文件的规则命中，生成检测结果"""
+        issues = []
+        files_analyzed = []
+        for file_path, file_issues in file_results:
+            issues.extend(_issue_dict(hit) for hit in file_issues)
+            if file_issues:
+                files_analyzed.append(os.path.basename(file_path))
+        
+        log_info(f"自定义规则检测完成，发现{len(issues)}个问题")
+        
+        severity_counts = Counter(i['severity'] for i in issues)
+        
+        return {
+            'success': True,
+            'tool': 'custom_rules',
+            'rules_applied': len(active_rules),
+            'issues': issues,
+            # 不同目录下的同名文件只保留一个（按首次出现顺序）
+            'files_analyzed': list(dict.fromkeys(files_analyzed)),
+            'summary': {
+                'total_issues': len(issues),
+                'critical': severity_counts['critical'],
+                'high': severity_counts['high'],
+                'medium': severity_counts['medium'],
+                'low': severity_counts['low']
+            }
+        }
+
+
+# 增量检测结果的持久化目录（位于结果目录下，每个项目一个文件）
+_INCREMENTAL_CACHE_DIR = 'custom_rules_cache'
+
+
+def _incremental_cache_path(project_path: str) -> str:
+    """项目对应的增量检测缓存文件（以项目绝对路径的摘要命名）"""
+    name = content_digest(os.path.realpath(project_path))
+    return os.path.join(settings.RESULTS_DIR, _INCREMENTAL_CACHE_DIR, f'{name}.json')
+
+
+def _file_stamp(file_path: str) -> Optional[List[int]]:
+    """文件的 [mtime(ns), 大小]，文件不存在时返回None"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _load_incremental_cache(cache_path: str, rules_hash: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    读取增量检测缓存：相对路径 -> {'stamp': [mtime, 大小], 'issues': [Issue, ...]}
+    文件不存在、损坏或规则配置哈希不一致时返回None
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        if data.get('rules_hash') != rules_hash:
+            log_info("规则配置已变化，增量检测缓存失效")
+            return None
+        return {
+            rel_path: {
+                'stamp': entry['stamp'],
+                'issues': [Issue(*row) for row in entry['issues']]
+            }
+            for rel_path, entry in data['files'].items()
+        }
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log_warning(f"读取增量检测缓存失败: {str(e)}")
+        return None
+
+
+def _save_incremental_cache(
+    cache_path: str, project_path: str, rules_hash: str, entries: Dict[str, Dict[str, Any]]
+):
+    """
+    写回增量检测缓存（问题记录按字段顺序存为数组）
+    
+    先写入同目录下的临时文件再原子替换，并发检测或写入中断时不会留下残缺的缓存文件
+    """
+    data = {
+        'project_path': os.path.realpath(project_path),
+        'rules_hash': rules_hash,
+        'files': {
+            rel_path: {'stamp': entry['stamp'], 'issues': [list(hit) for hit in entry['issues']]}
+            for rel_path, entry in entries.items()
+        }
+    }
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except Exception as e:
+        log_warning(f"写入增量检测缓存失败: {str(e)}")
+
+
+def _prune_incremental_caches(cache_dir: str):
+    """删除所属项目目录已不存在的增量检测缓存文件"""
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        cache_path = os.path.join(cache_dir, name)
+        try:
+            with open(cache_path, 'rb') as f:
+                raw = f.read()
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            project_path = data.get('project_path')
+        except Exception:
+            # 损坏的缓存文件同样清理
+            project_path = None
+        if project_path is None or not os.path.isdir(project_path):
+            try:
+                os.remove(cache_path)
+            except OSError:
+                pass
+
+
+# 每个进程池任务处理的文件数
+_FILES_PER_TASK = 8
+
+def _scan_files(
+    tasks: List[Tuple[str, Optional[str]]],
+    rules: List[CustomRule],
+    rules_by_ext: Optional[Dict[str, Tuple[CustomRule, ...]]]
+) -> List[Tuple[str, str, Optional[List[Issue]]]]:
+    """
+    进程池任务入口：依次扫描一组 (文件路径, 已缓存的内容摘要)
+    
+    返回 (文件路径, 内容摘要, 问题列表)；内容摘要与缓存一致的文件不扫描，问题列表为None。
+    读取失败的文件被跳过
+    """
+    results = []
+    # 单个读取线程按顺序预读本组文件，磁盘I/O与当前文件的正则扫描重叠进行
+    with ThreadPoolExecutor(max_workers=1) as reader:
+        sources = [reader.submit(read_source, file_path) for file_path, _ in tasks]
+        for (file_path, known_digest), source in zip(tasks, sources):
+            try:
+                code = source.result()
+            except Exception as e:
+                log_warning(f"读取文件失败 {file_path}: {str(e)}")
+                continue
+            
+            digest = content_digest(code)
+            if digest == known_digest:
+                results.append((file_path, digest, None))
+                continue
+            
+            if rules_by_ext is not None:
+                applicable = rules_by_ext.get(_ext_key(file_path), ())
+            else:
+                applicable = tuple(r for r in rules if r.applies_to(file_path))
+            applicable = tuple(r for r in applicable if r.may_match(code))
+            file_issues = []
+            if applicable:
+                master = _compile_master(tuple(r.pattern_src for r in applicable))
+                file_issues = _scan_rules(code, file_path, applicable, master)
+            results.append((file_path, digest, file_issues))
+    return results
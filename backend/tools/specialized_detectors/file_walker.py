@@ -0,0 +1,42 @@
+"""
+项目文件遍历
+作用：基于os.scandir遍历目录树，供各专项检测器查找待检测的源文件
+依赖：os
+调用关系：被custom_rules、memory_pool_detector使用
+"""
+import os
+from typing import Callable, Iterator, Optional
+
+
+def iter_files(root: str, skip_dir: Optional[Callable[[str], bool]] = None) -> Iterator[os.DirEntry]:
+    """
+    按与 os.walk(topdown=True) 相同的顺序产出目录树下的文件条目
+
+    scandir 直接返回条目类型，无需对每个条目再 stat 一次；
+    与 os.walk 一样不进入指向目录的符号链接，无法读取的目录被忽略。
+
+    Args:
+        root: 起始目录
+        skip_dir: 接收目录名，返回True时不进入该目录
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                (subdirs if is_dir else files).append(entry)
+    except OSError:
+        return
+    
+    yield from files
+    
+    for entry in subdirs:
+        if skip_dir is not None and skip_dir(entry.name):
+            continue
+        if entry.is_symlink():
+            continue
+        yield from iter_files(entry.path, skip_dir)
@@ -4,11 +4,92 @@
 """
 import os
 import re
-from typing import Dict, List, Any
+import sys
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple, Union
 from .pattern_matcher import PatternMatcher
+from .file_walker import iter_files
+from .process_pool import run_chunks
+from .source_cache import FileIssueCache, content_digest, read_source
 from utils.logger import log_info, log_error
 
 
+# 整文件扫描使用的模式中空白不跨越换行，保证与逐行匹配的语义一致
+_USECOUNT_RE = re.compile(r'span->_useCount[^\S\n]*([+\-]=|\+\+|--)')
+_RELEASE_RE = re.compile(r'if[^\S\n]*\([^\S\n]*span->_useCount[^\S\n]*==[^\S\n]*0[^\S\n]*\)')
+_MTX_LOCK_RE = re.compile(r'\._mtx\.lock\(\)')
+_NEW_SPAN_RE = re.compile(r'new[^\S\n]+Span')
+
+# 函数索引用的记号：注释与字符串字面量整体跳过，避免其中的括号干扰花括号匹配
+_FUNC_TOKEN_RE = re.compile(
+    r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+    r'|[A-Za-z_]\w*(?=\s*\()|[{}();\n]',
+    re.S
+)
+
+
+# 问题中的元数据字段：同值字符串驻留为同一对象，减少内存并使比较退化为指针比较
+_INTERNED_FIELDS = ('type', 'severity', 'file')
+
+
+@lru_cache(maxsize=1024)
+def _file_name(file_path: str) -> str:
+    """按路径缓存的文件名（已驻留），同一文件的所有问题共用同一字符串对象"""
+    return sys.intern(os.path.basename(file_path))
+
+
+def _intern_issue(issue: Dict[str, Any]) -> Dict[str, Any]:
+    """驻留问题的元数据字符串（工作进程回传的问题经反序列化后是新的字符串对象）"""
+    for key in _INTERNED_FIELDS:
+        value = issue.get(key)
+        if isinstance(value, str):
+            issue[key] = sys.intern(value)
+    return issue
+
+
+def _line_starts(lines: List[str]) -> List[int]:
+    """计算每行在原文中的起始偏移，末尾附加哨兵（len(code) + 1）"""
+    starts = [0]
+    pos = 0
+    for line in lines:
+        pos += len(line) + 1
+        starts.append(pos)
+    return starts
+
+
+def _window(code: str, line_starts: List[int], start: int, end: int) -> str:
+    """取 lines[start:end] 对应的原文切片（下标语义与列表切片一致），无需重新拼接上下文"""
+    start, end, _ = slice(start, end).indices(len(line_starts) - 1)
+    if start >= end:
+        return ''
+    return code[line_starts[start]:line_starts[end]]
+
+
+def _hit_lines(needle: Union[str, re.Pattern], code: str, line_starts: List[int]) -> List[int]:
+    """
+    整文件扫描子串或正则，返回命中的行号（1起，升序去重）
+    每行命中一次后直接跳到下一行开头继续查找
+    """
+    if isinstance(needle, str):
+        def find(pos):
+            return code.find(needle, pos)
+    else:
+        def find(pos):
+            m = needle.search(code, pos)
+            return m.start() if m else -1
+    
+    result = []
+    pos = find(0)
+    while pos != -1:
+        line_num = bisect_right(line_starts, pos)
+        result.append(line_num)
+        pos = find(line_starts[line_num])
+    return result
+
+
 class MemoryPoolDetector:
     """内存池专项检测器 - 针对高并发内存池项目"""
     
@@ -25,6 +106,9 @@ class MemoryPoolDetector:
         
         # 关键数据结构
         self.data_structures = ['Span', 'FreeList', 'SpanList']
+        
+        # 单文件结果缓存：内容未变化的文件不再重复检测
+        self._issue_cache = FileIssueCache('memory_pool')
     
     async def detect(self, project_path: str) -> Dict[str, Any]:
         """执行专项检测"""
@@ -44,38 +128,30 @@ class MemoryPoolDetector:
                     'files_analyzed': 0
                 }
             
-            # 2. 对每个文件执行检测
-            for file_path in pool_files:
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        code = f.read()
-                    
-                    file_issues = []
-                    
-                    # 检测1: Span使用计数问题
-                    file_issues.extend(self._detect_span_usecount_errors(code, file_path))
-                    
-                    # 检测2: 锁的粒度问题
-                    file_issues.extend(self._detect_lock_granularity(code, file_path))
-                    
-                    # 检测3: PageCache合并逻辑
-                    file_issues.extend(self._detect_page_merge_issues(code, file_path))
-                    
-                    # 检测4: FreeList操作安全性
-                    file_issues.extend(self._detect_freelist_issues(code, file_path))
-                    
-                    # 检测5: 内存泄漏风险点
-                    file_issues.extend(self._detect_memory_leak_risks(code, file_path))
-                    
+            # 2. 对每个文件执行检测（文件间互不依赖，按块分发到进程池并行）
+            tasks = [(file_path, self._issue_cache.known_digest(file_path)) for file_path in pool_files]
+            chunks = [tasks[i:i + _FILES_PER_TASK]
+                      for i in range(0, len(tasks), _FILES_PER_TASK)]
+            if len(chunks) == 1:
+                results = [_analyze_files(chunks[0])]
+            else:
+                results = await run_chunks(_analyze_files, chunks)
+            
+            for chunk_result in results:
+                for file_path, digest, file_issues in chunk_result:
+                    # 内容摘要与缓存一致时任务不返回结果，直接复用缓存
+                    if file_issues is None:
+                        file_issues = self._issue_cache.get(file_path)
+                    else:
+                        file_issues = [_intern_issue(issue) for issue in file_issues]
+                        self._issue_cache.put(file_path, digest, file_issues)
                     issues.extend(file_issues)
                     files_analyzed.append(os.path.basename(file_path))
-                    
-                except Exception as e:
-                    log_error(f"分析文件失败 {file_path}: {str(e)}")
-                    continue
             
             log_info(f"内存池检测完成，分析{len(files_analyzed)}个文件，发现{len(issues)}个问题")
             
+            severity_counts = Counter(i['severity'] for i in issues)
+            
             return {
                 'success': True,
                 'tool': 'memory_pool_detector',
@@ -84,9 +160,9 @@ class MemoryPoolDetector:
                 'files_analyzed': files_analyzed,
                 'summary': {
                     'total_issues': len(issues),
-                    'critical': len([i for i in issues if i['severity'] == 'critical']),
-                    'high': len([i for i in issues if i['severity'] == 'high']),
-                    'medium': len([i for i in issues if i['severity'] == 'medium'])
+                    'critical': severity_counts['critical'],
+                    'high': severity_counts['high'],
+                    'medium': severity_counts['medium']
                 }
             }
             
@@ -94,94 +170,158 @@ class MemoryPoolDetector:
             log_error(f"内存池检测异常: {str(e)}")
             return {'success': False, 'error': str(e), 'issues': []}
     
+    def _analyze_source(self, code: str, file_path: str) -> List[Dict[str, Any]]:
+        """对已读入的源码执行全部专项检测"""
+        lines = code.split('\n')
+        line_starts = _line_starts(lines)
+        file_issues = []
+        
+        # 检测1: Span使用计数问题
+        file_issues.extend(self._detect_span_usecount_errors(code, lines, line_starts, file_path))
+        
+        # 检测2: 锁的粒度问题
+        file_issues.extend(self._detect_lock_granularity(code, lines, line_starts, file_path))
+        
+        # 检测3: PageCache合并逻辑
+        file_issues.extend(self._detect_page_merge_issues(code, lines, line_starts, file_path))
+        
+        # 检测4: FreeList操作安全性
+        file_issues.extend(self._detect_freelist_issues(code, lines, line_starts, file_path))
+        
+        # 检测5: 内存泄漏风险点
+        file_issues.extend(self._detect_memory_leak_risks(code, lines, line_starts, file_path))
+        
+        return file_issues
+    
+    def _index_functions(self, code: str) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        单遍花括号匹配建立函数索引：函数名（不含类限定）-> [(起始行下标, 结束行下标+1)]
+        
+        范围从函数名所在行到与函数体 { 匹配的 } 所在行，可直接用于 lines[start:end]。
+        函数体内的控制语句、lambda 等嵌套作用域只参与深度计数，不单独建索引。
+        """
+        functions: Dict[str, List[Tuple[int, int]]] = {}
+        line = 0
+        depth = 0
+        paren_depth = 0
+        candidate = None    # (函数名, 所在行)：顶层 '(' 前的标识符，等待函数体 {
+        body = None         # 当前函数：(函数名, 起始行, 函数体 { 的深度)
+        
+        for m in _FUNC_TOKEN_RE.finditer(code):
+            tok = m.group()
+            if tok == '\n' or tok.startswith('/*'):
+                line += tok.count('\n')
+                continue
+            if tok[0] in '/"\'':
+                continue
+            
+            if tok == '(':
+                paren_depth += 1
+            elif tok == ')':
+                paren_depth = max(0, paren_depth - 1)
+            elif tok == '{':
+                depth += 1
+                if body is None and candidate is not None and not paren_depth:
+                    body = (candidate[0], candidate[1], depth)
+                candidate = None
+            elif tok == '}':
+                if body is not None and body[2] == depth:
+                    functions.setdefault(body[0], []).append((body[1], line + 1))
+                    body = None
+                depth = max(0, depth - 1)
+                candidate = None
+            elif tok == ';':
+                if not paren_depth:
+                    candidate = None
+            elif body is None and not paren_depth:
+                candidate = (tok, line)
+        
+        return functions
+    
     def _find_pool_files(self, project_path: str) -> List[str]:
         """查找内存池相关文件"""
-        pool_files = []
-        target_files = [
+        target_files = {
             'ThreadCache.cpp', 'ThreadCache.h',
             'CentralCache.cpp', 'CentralCache.h',
             'PageCache.cpp', 'PageCache.h',
             'Common.h', 'ConcurrentAlloc.h'
-        ]
+        }
         
-        for root, dirs, files in os.walk(project_path):
-            for file in files:
-                if file in target_files or any(cls in file for cls in self.core_classes):
-                    pool_files.append(os.path.join(root, file))
+        pool_files = [
+            entry.path for entry in iter_files(project_path)
+            if entry.name in target_files or any(cls in entry.name for cls in self.core_classes)
+        ]
         
         return pool_files
     
-    def _detect_span_usecount_errors(self, code: str, file_path: str) -> List[Dict[str, Any]]:
+    def _detect_span_usecount_errors(
+        self, code: str, lines: List[str], line_starts: List[int], file_path: str
+    ) -> List[Dict[str, Any]]:
         """检测Span使用计数管理错误"""
         issues = []
-        lines = code.split('\n')
         
         # 查找 _useCount 的修改
-        usecount_pattern = r'span->_useCount\s*([+\-]=|\+\+|--)'
-        
-        for line_num, line in enumerate(lines, 1):
-            if re.search(usecount_pattern, line):
-                # 检查是否在锁保护内
-                context_start = max(0, line_num - 15)
-                context_end = min(len(lines), line_num + 5)
-                context = '\n'.join(lines[context_start:context_end])
-                
-                # 查找是否有mutex.lock()
-                has_lock = bool(re.search(r'\._mtx\.lock\(\)', context))
-                
-                if not has_lock and 'CentralCache' in file_path:
-                    issues.append({
-                        'type': 'thread_safety',
-                        'severity': 'critical',
-                        'file': os.path.basename(file_path),
-                        'line': line_num,
-                        'code': line.strip(),
-                        'message': 'Span._useCount修改可能缺少锁保护',
-                        'suggestion': '确保在_spanLists[index]._mtx保护下修改_useCount'
-                    })
+        for line_num in _hit_lines(_USECOUNT_RE, code, line_starts):
+            # 检查是否在锁保护内
+            context_start = max(0, line_num - 15)
+            context_end = min(len(lines), line_num + 5)
+            context = _window(code, line_starts, context_start, context_end)
+            
+            # 查找是否有mutex.lock()
+            has_lock = bool(_MTX_LOCK_RE.search(context))
+            
+            if not has_lock and 'CentralCache' in file_path:
+                issues.append({
+                    'type': 'thread_safety',
+                    'severity': 'critical',
+                    'file': _file_name(file_path),
+                    'line': line_num,
+                    'code': lines[line_num - 1].strip(),
+                    'message': 'Span._useCount修改可能缺少锁保护',
+                    'suggestion': '确保在_spanLists[index]._mtx保护下修改_useCount'
+                })
         
         # 检测 _useCount == 0 判断后是否正确处理
-        release_pattern = r'if\s*\(\s*span->_useCount\s*==\s*0\s*\)'
-        for line_num, line in enumerate(lines, 1):
-            if re.search(release_pattern, line):
-                # 检查后续是否有Erase和ReleaseSpanToPageCache
-                context = '\n'.join(lines[line_num:min(len(lines), line_num+20)])
-                
-                has_erase = 'Erase(span)' in context
-                has_release = 'ReleaseSpanToPageCache' in context
-                
-                if not (has_erase and has_release):
-                    issues.append({
-                        'type': 'resource_leak',
-                        'severity': 'high',
-                        'file': os.path.basename(file_path),
-                        'line': line_num,
-                        'message': 'Span._useCount==0时可能未正确回收到PageCache',
-                        'suggestion': '应该调用_spanLists[index].Erase()和PageCache::ReleaseSpanToPageCache()'
-                    })
+        for line_num in _hit_lines(_RELEASE_RE, code, line_starts):
+            # 检查后续是否有Erase和ReleaseSpanToPageCache
+            context = _window(code, line_starts, line_num, min(len(lines), line_num+20))
+            
+            has_erase = 'Erase(span)' in context
+            has_release = 'ReleaseSpanToPageCache' in context
+            
+            if not (has_erase and has_release):
+                issues.append({
+                    'type': 'resource_leak',
+                    'severity': 'high',
+                    'file': _file_name(file_path),
+                    'line': line_num,
+                    'message': 'Span._useCount==0时可能未正确回收到PageCache',
+                    'suggestion': '应该调用_spanLists[index].Erase()和PageCache::ReleaseSpanToPageCache()'
+                })
         
         return issues
     
-    def _detect_lock_granularity(self, code: str, file_path: str) -> List[Dict[str, Any]]:
+    def _detect_lock_granularity(
+        self, code: str, lines: List[str], line_starts: List[int], file_path: str
+    ) -> List[Dict[str, Any]]:
         """检测锁粒度问题"""
         issues = []
-        lines = code.split('\n')
         
         # 检测跨层调用时的锁顺序
         if 'CentralCache' in file_path:
-            for line_num, line in enumerate(lines, 1):
+            for line_num in _hit_lines('_mtx.lock()', code, line_starts):
                 # 查找CentralCache持锁时调用PageCache
-                if '_spanLists[' in line and '_mtx.lock()' in line:
+                if '_spanLists[' in lines[line_num - 1]:
                     # 查找后续是否直接调用PageCache（可能死锁）
-                    context = '\n'.join(lines[line_num:min(len(lines), line_num+30)])
+                    context = _window(code, line_starts, line_num, min(len(lines), line_num+30))
                     
                     if 'PageCache::GetInstance()' in context and '_pageMtx.lock()' in context:
                         # 正确做法：先unlock central cache锁
-                        if 'list._mtx.unlock()' not in context.split('PageCache')[0]:
+                        if 'list._mtx.unlock()' not in context[:context.index('PageCache')]:
                             issues.append({
                                 'type': 'deadlock_risk',
                                 'severity': 'critical',
-                                'file': os.path.basename(file_path),
+                                'file': _file_name(file_path),
                                 'line': line_num,
                                 'message': '可能的死锁：CentralCache持锁时获取PageCache锁',
                                 'suggestion': '参考GetOneSpan()，先unlock再获取PageCache锁'
@@ -189,34 +329,32 @@ class MemoryPoolDetector:
         
         return issues
     
-    def _detect_page_merge_issues(self, code: str, file_path: str) -> List[Dict[str, Any]]:
+    def _detect_page_merge_issues(
+        self, code: str, lines: List[str], line_starts: List[int], file_path: str
+    ) -> List[Dict[str, Any]]:
         """检测PageCache页面合并逻辑"""
         issues = []
         
         if 'PageCache' not in file_path:
             return issues
         
-        lines = code.split('\n')
-        
-        # 查找ReleaseSpanToPageCache函数
-        in_release_func = False
-        func_start = 0
         
-        for line_num, line in enumerate(lines, 1):
-            if 'ReleaseSpanToPageCache' in line and '::' in line:
-                in_release_func = True
-                func_start = line_num
-            
-            if in_release_func:
+        # 只检查ReleaseSpanToPageCache函数体（由花括号匹配确定范围，嵌套作用域不会提前结束）
+        functions = self._index_functions(code)
+        for start, end in functions.get('ReleaseSpanToPageCache', []):
+            for idx in range(start, end):
+                line = lines[idx]
+                line_num = idx + 1
+                
                 # 检查合并前是否检查_isUse标志
                 if 'prevSpan' in line or 'nextSpan' in line:
-                    context = '\n'.join(lines[max(0, line_num-5):line_num+5])
+                    context = _window(code, line_starts, max(0, line_num-5), line_num+5)
                     
                     if '->_isUse' not in context and 'if' in line:
                         issues.append({
                             'type': 'logic_error',
                             'severity': 'high',
-                            'file': os.path.basename(file_path),
+                            'file': _file_name(file_path),
                             'line': line_num,
                             'message': '页面合并前可能未检查_isUse标志',
                             'suggestion': '合并前必须确认相邻Span的_isUse == false'
@@ -224,37 +362,39 @@ class MemoryPoolDetector:
                 
                 # 检查是否有128页限制检查
                 if 'span->_n' in line and '+' in line:
-                    if 'NPAGES' not in '\n'.join(lines[line_num-3:line_num+3]):
+                    if 'NPAGES' not in _window(code, line_starts, line_num-3, line_num+3):
                         issues.append({
                             'type': 'boundary_check',
                             'severity': 'medium',
-                            'file': os.path.basename(file_path),
+                            'file': _file_name(file_path),
                             'line': line_num,
                             'message': '合并Span时可能未检查NPAGES边界',
                             'suggestion': '确保合并后的Span不超过NPAGES-1'
                         })
-                
-                if line.strip() == '}' and in_release_func:
-                    in_release_func = False
         
         return issues
     
-    def _detect_freelist_issues(self, code: str, file_path: str) -> List[Dict[str, Any]]:
+    def _detect_freelist_issues(
+        self, code: str, lines: List[str], line_starts: List[int], file_path: str
+    ) -> List[Dict[str, Any]]:
         """检测FreeList操作安全性"""
         issues = []
-        lines = code.split('\n')
+        
+        pop_lines = _hit_lines('PopRange', code, line_starts)
+        next_lines = _hit_lines('NextObj(end)', code, line_starts)
         
         # 检测PopRange和PushRange的边界
-        for line_num, line in enumerate(lines, 1):
+        for line_num in sorted(set(pop_lines).union(next_lines)):
+            line = lines[line_num - 1]
             if 'PopRange' in line:
                 # 检查是否有Size()检查
-                context = '\n'.join(lines[max(0, line_num-5):line_num])
+                context = _window(code, line_starts, max(0, line_num-5), line_num)
                 
                 if 'assert' not in context and 'if' not in context:
                     issues.append({
                         'type': 'boundary_check',
                         'severity': 'medium',
-                        'file': os.path.basename(file_path),
+                        'file': _file_name(file_path),
                         'line': line_num,
                         'message': 'PopRange前可能未检查FreeList大小',
                         'suggestion': '调用PopRange前应检查n <= _size'
@@ -262,13 +402,13 @@ class MemoryPoolDetector:
             
             # 检测NextObj空指针解引用
             if 'NextObj(end)' in line and '=' in line and 'nullptr' not in line:
-                context = '\n'.join(lines[max(0, line_num-3):line_num+1])
+                context = _window(code, line_starts, max(0, line_num-3), line_num+1)
                 
                 if 'while' not in context and 'if' not in context:
                     issues.append({
                         'type': 'null_pointer',
                         'severity': 'high',
-                        'file': os.path.basename(file_path),
+                        'file': _file_name(file_path),
                         'line': line_num,
                         'message': '可能的空指针解引用：NextObj(end)未检查end是否为nullptr',
                         'suggestion': '在循环中应检查end != nullptr'
@@ -276,41 +416,76 @@ class MemoryPoolDetector:
         
         return issues
     
-    def _detect_memory_leak_risks(self, code: str, file_path: str) -> List[Dict[str, Any]]:
+    def _detect_memory_leak_risks(
+        self, code: str, lines: List[str], line_starts: List[int], file_path: str
+    ) -> List[Dict[str, Any]]:
         """检测内存泄漏风险点"""
         issues = []
-        lines = code.split('\n')
         
         # 检测SystemAlloc后是否正确映射
-        for line_num, line in enumerate(lines, 1):
-            if 'SystemAlloc' in line:
-                context = '\n'.join(lines[line_num:min(len(lines), line_num+10)])
-                
-                # 检查是否建立了_idSpanMap映射
-                if '_idSpanMap' not in context and 'PageCache' in file_path:
-                    issues.append({
-                        'type': 'resource_leak',
-                        'severity': 'high',
-                        'file': os.path.basename(file_path),
-                        'line': line_num,
-                        'message': 'SystemAlloc后可能未建立页ID到Span的映射',
-                        'suggestion': '调用_idSpanMap.set()建立映射关系'
-                    })
+        for line_num in _hit_lines('SystemAlloc', code, line_starts):
+            context = _window(code, line_starts, line_num, min(len(lines), line_num+10))
+            
+            # 检查是否建立了_idSpanMap映射
+            if '_idSpanMap' not in context and 'PageCache' in file_path:
+                issues.append({
+                    'type': 'resource_leak',
+                    'severity': 'high',
+                    'file': _file_name(file_path),
+                    'line': line_num,
+                    'message': 'SystemAlloc后可能未建立页ID到Span的映射',
+                    'suggestion': '调用_idSpanMap.set()建立映射关系'
+                })
         
         # 检测new Span后是否正确管理
-        for line_num, line in enumerate(lines, 1):
-            if re.search(r'new\s+Span', line):
-                context = '\n'.join(lines[line_num:min(len(lines), line_num+20)])
-                
-                # 检查是否加入到SpanList或_idSpanMap
-                if 'PushFront' not in context and '_idSpanMap' not in context:
-                    issues.append({
-                        'type': 'resource_leak',
-                        'severity': 'high',
-                        'file': os.path.basename(file_path),
-                        'line': line_num,
-                        'message': 'new Span后可能未正确管理（未加入SpanList）',
-                        'suggestion': '确保Span被加入到_spanLists或建立映射'
-                    })
+        for line_num in _hit_lines(_NEW_SPAN_RE, code, line_starts):
+            context = _window(code, line_starts, line_num, min(len(lines), line_num+20))
+            
+            # 检查是否加入到SpanList或_idSpanMap
+            if 'PushFront' not in context and '_idSpanMap' not in context:
+                issues.append({
+                    'type': 'resource_leak',
+                    'severity': 'high',
+                    'file': _file_name(file_path),
+                    'line': line_num,
+                    'message': 'new Span后可能未正确管理（未加入SpanList）',
+                    'suggestion': '确保Span被加入到_spanLists或建立映射'
+                })
         
         return issues
+
+
+# 每个进程池任务处理的文件数
+_FILES_PER_TASK = 8
+
+# 工作进程内复用的检测器实例
+_worker_detector = None
+
+
+def _analyze_files(
+    tasks: List[Tuple[str, Optional[str]]]
+) -> List[Tuple[str, str, Optional[List[Dict[str, Any]]]]]:
+    """
+    进程池任务入口：依次检测一组 (文件路径, 已缓存的内容摘要)
+    
+    返回 (文件路径, 内容摘要, 问题列表)；内容摘要与缓存一致的文件不检测，问题列表为None
+    """
+    global _worker_detector
+    if _worker_detector is None:
+        _worker_detector = MemoryPoolDetector()
+    
+    results = []
+    # 单个读取线程按顺序预读本组文件，磁盘I/O与当前文件的检测重叠进行
+    with ThreadPoolExecutor(max_workers=1) as reader:
+        sources = [reader.submit(read_source, file_path) for file_path, _ in tasks]
+        for (file_path, known_digest), source in zip(tasks, sources):
+            try:
+                code = source.result()
+                digest = content_digest(code)
+                if digest == known_digest:
+                    results.append((file_path, digest, None))
+                else:
+                    results.append((file_path, digest, _worker_detector._analyze_source(code, file_path)))
+            except Exception as e:
+                log_error(f"分析文件失败 {file_path}: {str(e)}")
+    return results
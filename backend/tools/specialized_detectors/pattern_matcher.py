@@ -4,10 +4,61 @@
 依赖：re, typing, utils.logger
 调用关系：被specialized_detectors中的各专项检测器使用
 """
+import heapq
 import re
-from typing import List, Dict, Any, Optional, Callable
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from utils.logger import log_info, log_error
 
+# 模式开头的字面量（可带前导\b），如 r'\bstrcpy\s*\(' 中的 strcpy
+_LITERAL_PREFIX_RE = re.compile(r'(?:\\b)?(\w+)')
+
+
+@lru_cache(maxsize=1024)
+def extract_required_literal(pattern: str) -> Optional[str]:
+    """
+    提取任何匹配都必然包含的字面量，文本中不含该字面量时可跳过正则匹配
+
+    只识别不含分支的模式开头的普通单词字符；被量词修饰的最后一个字符不计入。
+    过短的字面量预筛意义不大，返回None
+    """
+    if '|' in pattern:
+        return None
+    m = _LITERAL_PREFIX_RE.match(pattern)
+    if not m:
+        return None
+    literal = m.group(1)
+    if pattern[m.end():m.end() + 1] in ('*', '?', '{', '+'):
+        literal = literal[:-1]
+    return literal if len(literal) >= 3 else None
+
+
+@lru_cache(maxsize=1024)
+def _compile_multiline(regex: str) -> re.Pattern:
+    """按模式字符串缓存编译结果（MULTILINE，使^/$在整段文本中按行生效）"""
+    return re.compile(regex, re.MULTILINE)
+
+
+def _line_offsets(code: str) -> Tuple[int, ...]:
+    """
+    构建行首偏移表（第i项为第i行起始偏移）
+    
+    不做跨调用缓存，以免长期持有整份源码；同一次调用内需多次匹配同一份源码时
+    （如 find_paired_calls）由调用方构建一次后传给 _regex_match。
+    """
+    offsets = [0]
+    find = code.find
+    pos = find('\n')
+    while pos != -1:
+        offsets.append(pos + 1)
+        pos = find('\n', pos + 1)
+    return tuple(offsets)
+
+
+# 整段匹配时会越过换行观察上下文的构造（环视、\A/\Z、$）；含这些构造的模式仍逐行匹配
+_LINE_SENSITIVE_RE = re.compile(r'\(\?<?[=!]|\\[AZ]|(?<!\\)\$')
+
 
 class PatternMatcher:
     """代码模式匹配器基类"""
@@ -58,23 +109,73 @@ class PatternMatcher:
         pattern = self.patterns[pattern_name]
         return self._regex_match(code, pattern)
     
-    def _regex_match(self, code: str, regex: str) -> List[Dict[str, Any]]:
+    def _regex_match(
+        self, 
+        code: str, 
+        regex: str, 
+        line_starts: Optional[Tuple[int, ...]] = None
+    ) -> List[Dict[str, Any]]:
         """
         执行正则匹配并返回位置信息
+        
+        匹配语义与逐行 finditer 相同：默认在整段缓冲区上一次 finditer，匹配偏移
+        经行首偏移表换算为 (行, 列)，跨越换行的匹配所涉及的行改为按行重新匹配；
+        含环视或 \A/\Z/$ 锚点的模式在整段文本中能看到相邻行，结果会不同，
+        这类模式直接逐行匹配。
+        
+        line_starts 为 code 的行首偏移表，未传入时按需构建。
         """
-        matches = []
-        lines = code.split('\n')
+        literal = extract_required_literal(regex)
+        if literal is not None and literal not in code:
+            return []
+        
+        compiled = _compile_multiline(regex)
         
-        for line_num, line_content in enumerate(lines, 1):
-            for match in re.finditer(regex, line_content):
-                matches.append({
+        if _LINE_SENSITIVE_RE.search(regex):
+            return [
+                {
                     'line': line_num,
                     'col': match.start(),
                     'matched_text': match.group(),
                     'groups': match.groups()
-                })
+                }
+                for line_num, line_content in enumerate(code.split('\n'), 1)
+                for match in compiled.finditer(line_content)
+            ]
         
-        return matches
+        if line_starts is None:
+            line_starts = _line_offsets(code)
+        
+        # 热循环中的属性/全局查找提前绑定为局部变量
+        find = code.find
+        hits = []
+        hits_append = hits.append
+        split_lines = set()
+        for match in compiled.finditer(code):
+            start, end = match.span()
+            line_idx = bisect_right(line_starts, start) - 1
+            if find('\n', start, end) != -1:
+                split_lines.update(range(line_idx, bisect_right(line_starts, end - 1)))
+                continue
+            hits_append((line_idx, start - line_starts[line_idx], match))
+        
+        if split_lines:
+            hits = [hit for hit in hits if hit[0] not in split_lines]
+            for line_idx in split_lines:
+                line_end = line_starts[line_idx + 1] - 1 if line_idx + 1 < len(line_starts) else len(code)
+                line_content = code[line_starts[line_idx]:line_end]
+                hits.extend((line_idx, match.start(), match) for match in compiled.finditer(line_content))
+            hits.sort(key=lambda hit: hit[:2])
+        
+        return [
+            {
+                'line': line_idx + 1,
+                'col': col,
+                'matched_text': match.group(),
+                'groups': match.groups()
+            }
+            for line_idx, col, match in hits
+        ]
     
     def find_function_calls(self, code: str, function_name: str) -> List[Dict[str, Any]]:
         """
@@ -99,6 +200,9 @@ class PatternMatcher:
         """
         查找成对出现的调用（如malloc/free, lock/unlock）
         
+        按出现位置顺序配对：打开调用入栈，关闭调用与最近一个未配对的打开调用配对，
+        栈为空时的关闭调用即未配对；同一行出现多次打开/关闭也能正确计数。
+        
         Returns:
             {
                 'open_calls': [...],
@@ -107,15 +211,28 @@ class PatternMatcher:
                 'unmatched_closes': [...]  # 可能的重复释放
             }
         """
-        open_calls = self._regex_match(code, open_pattern)
-        close_calls = self._regex_match(code, close_pattern)
+        line_starts = _line_offsets(code)
+        open_calls = self._regex_match(code, open_pattern, line_starts)
+        close_calls = self._regex_match(code, close_pattern, line_starts)
         
-        # 简单的配对检查（实际项目中需要更复杂的数据流分析）
-        open_lines = {match['line'] for match in open_calls}
-        close_lines = {match['line'] for match in close_calls}
+        # 基于位置的栈式配对（实际项目中需要更复杂的数据流分析）
+        # 两个列表本身已按 (行, 列) 有序，归并一次即可；同一位置先处理打开调用
+        events = heapq.merge(
+            ((m['line'], m['col'], 0, m) for m in open_calls),
+            ((m['line'], m['col'], 1, m) for m in close_calls),
+            key=lambda event: event[:3]
+        )
         
-        unmatched_opens = [m for m in open_calls if m['line'] not in close_lines]
-        unmatched_closes = [m for m in close_calls if m['line'] not in open_lines]
+        pending_opens = []
+        unmatched_closes = []
+        for _, _, is_close, match in events:
+            if not is_close:
+                pending_opens.append(match)
+            elif pending_opens:
+                pending_opens.pop()
+            else:
+                unmatched_closes.append(match)
+        unmatched_opens = pending_opens
         
         return {
             'open_calls': open_calls,
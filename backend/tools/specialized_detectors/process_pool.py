@@ -0,0 +1,62 @@
+"""
+专项检测器共享进程池
+作用：延迟创建一个进程数有界的进程池，供各专项检测器并行执行按文件分块的检测任务
+依赖：asyncio、concurrent.futures、multiprocessing
+调用关系：被btop_detector、memory_pool_detector、custom_rules使用
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Sequence
+
+# 工作进程数上限
+_MAX_WORKERS = max(1, min(os.cpu_count() or 1, 8))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _mp_context():
+    """
+    工作进程启动方式：forkserver（不支持的平台使用spawn）
+
+    不直接fork服务进程，避免子进程继承事件循环、线程与锁的状态
+    """
+    try:
+        return multiprocessing.get_context('forkserver')
+    except ValueError:
+        return multiprocessing.get_context('spawn')
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """获取共享进程池（首次使用时创建，之后各次检测复用同一组工作进程）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=_MAX_WORKERS, mp_context=_mp_context())
+        return _pool
+
+
+async def run_chunks(func: Callable[..., Any], chunks: Sequence[Any], *args: Any) -> List[Any]:
+    """
+    每个分块作为一个任务提交到共享进程池，按分块顺序返回 func(chunk, *args) 的结果
+
+    func 与参数需可pickle（模块级函数）；工作进程异常退出导致进程池损坏时丢弃该进程池，
+    下次调用重新创建
+    """
+    global _pool
+    pool = get_process_pool()
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.gather(
+            *(loop.run_in_executor(pool, func, chunk, *args) for chunk in chunks)
+        )
+    except BrokenProcessPool:
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        pool.shutdown(wait=False)
+        raise
@@ -0,0 +1,107 @@
+"""
+源文件读取与单文件检测结果缓存
+作用：读取待检测源文件；按文件内容摘要缓存专项检测器的单文件结果，重复检测未修改的文件时直接复用
+依赖：hashlib、mmap、threading（可选xxhash）
+调用关系：被custom_rules、memory_pool_detector使用
+"""
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+try:
+    import xxhash
+except Exception:
+    xxhash = None
+
+
+# 不小于该大小的文件通过mmap读取
+_MMAP_THRESHOLD = 64 * 1024
+
+# 单文件检测结果缓存的条目上限（只保存问题列表，不保存源码）
+_MAX_CACHED_FILES = 4096
+
+# (检测器类别, 规则版本, 文件绝对路径) -> (内容摘要, 问题列表)，按最近使用排序
+_ENTRIES: Dict[Tuple[str, Optional[str], str], Tuple[str, List[Any]]] = OrderedDict()
+_ENTRIES_LOCK = threading.Lock()
+
+
+def read_source(file_path: str) -> str:
+    """
+    读取源文件文本，结果与 utf-8 / errors='ignore' 文本模式读取一致
+    
+    大文件经 mmap 只读映射后直接解码，省去中间的 bytes 读缓冲；
+    小文件映射的系统调用开销不划算，直接读取
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= _MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    code = str(view, 'utf-8', 'ignore')
+        else:
+            code = f.read().decode('utf-8', 'ignore')
+    # 与文本模式一致：统一换行符
+    if '\r' in code:
+        code = code.replace('\r\n', '\n').replace('\r', '\n')
+    return code
+
+
+def content_digest(code: str) -> str:
+    """计算源码内容摘要（安装了xxhash时使用xxh3，否则blake2b）"""
+    data = code.encode('utf-8', 'surrogatepass')
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _copy_issue(issue: Any) -> Any:
+    """问题字典复制一份；不可变的问题记录（NamedTuple）直接共享"""
+    return dict(issue) if isinstance(issue, dict) else issue
+
+
+class FileIssueCache:
+    """
+    文件绝对路径 -> (内容摘要, 问题列表)；按检测器类别与规则版本区分
+    
+    检测器实例按请求新建，条目因此存放在模块级的有界LRU中，跨实例共享；
+    旧规则版本的条目不再被访问，随LRU淘汰
+    """
+    
+    def __init__(self, namespace: str):
+        self._namespace = namespace
+        self._version: Optional[str] = None
+    
+    def set_version(self, version: Hashable):
+        """设置当前规则版本（之后的读写只涉及该版本的条目）"""
+        self._version = content_digest(repr(version))
+    
+    def _key(self, file_path: str) -> Tuple[str, Optional[str], str]:
+        return self._namespace, self._version, os.path.abspath(file_path)
+    
+    def known_digest(self, file_path: str) -> Optional[str]:
+        """已缓存结果对应的内容摘要，未缓存时返回None"""
+        key = self._key(file_path)
+        with _ENTRIES_LOCK:
+            entry = _ENTRIES.get(key)
+            if entry is None:
+                return None
+            _ENTRIES.move_to_end(key)
+        return entry[0]
+    
+    def get(self, file_path: str) -> List[Any]:
+        """取缓存的问题列表（返回副本，调用方修改问题不会影响缓存）"""
+        with _ENTRIES_LOCK:
+            _, issues = _ENTRIES[self._key(file_path)]
+        return [_copy_issue(issue) for issue in issues]
+    
+    def put(self, file_path: str, digest: str, issues: List[Any]):
+        """保存单文件检测结果（问题字典或不可变的问题记录）"""
+        entry = (digest, [_copy_issue(issue) for issue in issues])
+        key = self._key(file_path)
+        with _ENTRIES_LOCK:
+            _ENTRIES[key] = entry
+            _ENTRIES.move_to_end(key)
+            while len(_ENTRIES) > _MAX_CACHED_FILES:
+                _ENTRIES.popitem(last=False)
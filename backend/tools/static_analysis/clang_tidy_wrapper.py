@@ -1,27 +1,100 @@
 # -*- coding: utf-8 -*-
 import os
+import re
+import shutil
 import subprocess
 import json
 import asyncio
-from typing import Dict, Any, List
+import tempfile
+from typing import Dict, Any, Iterator, List, Optional
+from config import settings
 from utils.logger import log_info, log_error
 
+# 单个文件的分析超时（秒），避免个别翻译单元卡住整批分析
+FILE_TIMEOUT = 120
+
+# 使用编译数据库整批分析（run-clang-tidy）时的总超时（秒）
+BATCH_TIMEOUT = 1800
+
+# 生成编译数据库（compiledb 解析 make -n 的输出）的超时（秒）
+COMPILE_DB_TIMEOUT = 300
+
+# 查找已有 compile_commands.json 的目录（相对项目根目录）
+COMPILE_DB_DIRS = ('', 'build', 'cmake-build-debug', 'cmake-build-release')
+
+# 诊断行：file:line:col: error|warning: message [check-name]
+# 文件名非贪婪匹配，可含 Windows 盘符；消息中的冒号原样保留
+_TIDY_LINE_RE = re.compile(
+    r'^(?P<file>.+?):(?P<line>\d+):(?P<col>\d+):\s+(?P<sev>error|warning):\s+(?P<msg>.*?)\r?$',
+    re.MULTILINE
+)
+
+# 需要分析的源文件扩展名（不含'.'）
+SOURCE_EXTS = frozenset({'cpp', 'cc', 'cxx', 'c'})
+
+
+def _iter_sources(root: str, exts: frozenset = SOURCE_EXTS) -> Iterator[str]:
+    """递归 scandir 查找源文件（DirEntry 自带类型信息，不必逐个 stat；不进入目录符号链接）"""
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_sources(entry.path, exts)
+                continue
+        except OSError:
+            continue
+        _, dot, ext = entry.name.rpartition('.')
+        if dot and ext in exts:
+            yield entry.path
+
+
+def _collect_files(project_path: str) -> List[str]:
+    """收集项目中需要分析的全部源文件"""
+    return list(_iter_sources(project_path))
+
+
+def _find_compile_db(project_path: str) -> Optional[str]:
+    """返回项目中包含 compile_commands.json 的目录，没有则返回 None"""
+    for sub_dir in COMPILE_DB_DIRS:
+        db_dir = os.path.join(project_path, sub_dir)
+        if os.path.isfile(os.path.join(db_dir, 'compile_commands.json')):
+            return db_dir
+    return None
+
+
+def _parse_output(output: str) -> List[Dict[str, Any]]:
+    """解析 Clang-tidy 输出 (格式: file:line:col: error: message [check-name])"""
+    return [
+        {
+            "file": m['file'],
+            "line": int(m['line']),
+            "column": int(m['col']),
+            "severity": "high" if m['sev'] == 'error' else "medium",
+            "message": m['msg'],
+            "tool": "clang-tidy",
+            "category": "code_quality"
+        }
+        for m in _TIDY_LINE_RE.finditer(output)
+    ]
+
 class ClangTidyWrapper:
-    """Clang-Tidy 静态分析工具封装"""
-    
-    def __init__(self):
-        pass
+    """Clang-Tidy 静态分析工具封装
+
+    无实例状态，问题列表均为 analyze() 的局部变量，可与其他分析工具并发运行
+    """
 
     async def analyze(self, project_path: str) -> Dict[str, Any]:
         """运行 Clang-Tidy 分析"""
         issues = []
         try:
             # 查找所有 cpp/cc/cxx 文件
-            files_to_check = []
-            for root, _, files in os.walk(project_path):
-                for f in files:
-                    if f.endswith(('.cpp', '.cc', '.cxx', '.c')):
-                        files_to_check.append(os.path.join(root, f))
+            # 目录遍历是阻塞的文件系统操作，放到线程池执行，避免阻塞事件循环
+            loop = asyncio.get_running_loop()
+            files_to_check = await loop.run_in_executor(None, _collect_files, project_path)
             
             if not files_to_check:
                 return {"success": True, "issues": []}
@@ -29,43 +102,44 @@ class ClangTidyWrapper:
             # 构造命令：检查性能、可读性、bugprone
             # 注意：没有 compile_commands.json 时，可能需要传入 -- 后面跟编译参数，这里做简化处理
             checks = "-*,bugprone-*,performance-*,readability-*,modernize-use-nullptr,modernize-use-override"
-            
-            # 限制并发数或每次只跑一部分，防止卡死
-            # 这里简单演示跑前 10 个文件，或者你可以全跑
-            cmd = ["clang-tidy", f"-checks={checks}"] + files_to_check[:20] + ["--", "-std=c++17"]
 
             log_info(f"启动 Clang-Tidy 分析 {len(files_to_check)} 个文件...")
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
+
+            # 有编译数据库时交给上游并行驱动 run-clang-tidy 整批分析（使用真实编译参数）
+            run_clang_tidy = shutil.which("run-clang-tidy")
+            if run_clang_tidy:
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    db_dir = _find_compile_db(project_path)
+                    if db_dir is None and await self._generate_compile_db(project_path, tmp_dir):
+                        db_dir = tmp_dir
+                    if db_dir is not None:
+                        batch_issues = await self._run_batch(run_clang_tidy, db_dir, checks)
+                        if batch_issues is not None:
+                            return {
+                                "success": True,
+                                "issues": batch_issues,
+                                "tool_name": "clang-tidy"
+                            }
+
+            # 每个文件单独一个 clang-tidy 进程（单线程的 AST 分析），按 CPU 核数限制并发
+            sem = asyncio.Semaphore(os.cpu_count() or 4)
+
+            async def _run_one(file_path: str) -> List[Dict[str, Any]]:
+                async with sem:
+                    return await self._run_file(file_path, checks)
+
+            results = await asyncio.gather(
+                *[_run_one(f) for f in files_to_check],
+                return_exceptions=True
             )
-            stdout, stderr = await process.communicate()
-            
-            # 解析输出 (Clang-tidy 输出格式: file:line:col: error: message [check-name])
-            output = stdout.decode('utf-8', errors='ignore')
-            for line in output.splitlines():
-                if "error:" in line or "warning:" in line:
-                    parts = line.split(':')
-                    if len(parts) >= 4:
-                        try:
-                            file_path = parts[0].strip()
-                            line_num = int(parts[1])
-                            # 提取 severity 和 message
-                            content = ":".join(parts[3:]).strip()
-                            
-                            issues.append({
-                                "file": file_path,
-                                "line": line_num,
-                                "column": int(parts[2]) if parts[2].isdigit() else 0,
-                                "severity": "medium", # Clang-tidy 大多是 medium/high
-                                "message": content,
-                                "tool": "clang-tidy",
-                                "category": "code_quality"
-                            })
-                        except:
-                            continue
+            for file_path, result in zip(files_to_check, results):
+                if isinstance(result, FileNotFoundError):
+                    # clang-tidy 未安装
+                    raise result
+                if isinstance(result, BaseException):
+                    log_error(f"Clang-Tidy 分析 {file_path} 失败: {result}")
+                    continue
+                issues.extend(result)
 
             return {
                 "success": True, 
@@ -76,3 +150,91 @@ class ClangTidyWrapper:
         except Exception as e:
             log_error(f"Clang-Tidy 分析失败: {e}")
             return {"success": False, "error": str(e), "issues": []}
+
+    async def _run_file(self, file_path: str, checks: str) -> List[Dict[str, Any]]:
+        """对单个文件运行 Clang-Tidy，超时的文件被终止并跳过"""
+        cmd = ["clang-tidy", f"-checks={checks}", file_path, "--", "-std=c++17"]
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=FILE_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            log_error(f"Clang-Tidy 分析 {file_path} 超时 ({FILE_TIMEOUT}秒)")
+            return []
+
+        return _parse_output(stdout.decode('utf-8', errors='ignore'))
+
+    async def _generate_compile_db(self, project_path: str, out_dir: str) -> bool:
+        """用 compiledb 解析 make -n 的输出生成编译数据库，成功返回 True
+
+        make -n 不编译，但仍会执行 Makefile 中的 $(shell ...) 和 '+' / $(MAKE) 行，
+        因此只在配置 CLANG_TIDY_MAKE_DRY_RUN 开启时运行
+        """
+        if not getattr(settings, "CLANG_TIDY_MAKE_DRY_RUN", False):
+            return False
+        if shutil.which("compiledb") is None:
+            return False
+        if not os.path.isfile(os.path.join(project_path, "Makefile")):
+            return False
+
+        db_file = os.path.join(out_dir, "compile_commands.json")
+        process = await asyncio.create_subprocess_exec(
+            "compiledb", "-n", "-o", db_file, "make",
+            cwd=project_path,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        try:
+            await asyncio.wait_for(process.wait(), timeout=COMPILE_DB_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            log_error(f"生成编译数据库超时 ({COMPILE_DB_TIMEOUT}秒)")
+            return False
+
+        try:
+            with open(db_file, 'r', encoding='utf-8') as f:
+                return bool(json.load(f))
+        except (OSError, ValueError):
+            return False
+
+    async def _run_batch(self, run_clang_tidy: str, db_dir: str, checks: str) -> Optional[List[Dict[str, Any]]]:
+        """用 run-clang-tidy 按编译数据库并行分析全部文件；失败或超时返回 None（回退逐文件分析）
+
+        以下情况视为失败：编译数据库中有文件无法处理（"Error while processing"），
+        或进程非零退出且没有解析出任何诊断（数据库损坏/为空、路径来自其他机器等）
+        """
+        cmd = [
+            run_clang_tidy, "-p", db_dir, "-j", str(os.cpu_count() or 4),
+            f"-checks={checks}", "-quiet"
+        ]
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=BATCH_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            log_error(f"run-clang-tidy 整批分析超时 ({BATCH_TIMEOUT}秒)，回退为逐文件分析")
+            return None
+
+        output = stdout.decode('utf-8', errors='ignore')
+        errors = stderr.decode('utf-8', errors='ignore')
+        issues = _parse_output(output)
+        if "Error while processing" in output or "Error while processing" in errors:
+            log_error("run-clang-tidy 无法处理编译数据库中的部分文件，回退为逐文件分析")
+            return None
+        if process.returncode != 0 and not issues:
+            log_error(f"run-clang-tidy 执行失败 (退出码 {process.returncode})，回退为逐文件分析: {errors[:500]}")
+            return None
+
+        log_info(f"run-clang-tidy 使用编译数据库 {db_dir} 完成分析")
+        return issues
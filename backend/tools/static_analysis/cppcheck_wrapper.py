@@ -4,33 +4,44 @@
 调用关系：被DetectionAgent调用
 """
 import asyncio
+import codecs
 import os
 import subprocess
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Any, Optional
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple
 from utils.logger import log_info, log_error
 
 
+# 读取Cppcheck输出的分块大小
+_READ_CHUNK_SIZE = 64 * 1024
+
+
 class CppcheckWrapper:
-    """Cppcheck静态分析工具封装"""
+    """Cppcheck静态分析工具封装
+
+    实例不保存分析过程中的可变状态，同一实例可被多个 analyze() 协程并发调用
+    """
+    
+    # 🆕 增强的默认参数（类级不可变元组，并发调用时不会被改写）
+    default_args = (
+        "--enable=all",           # 启用所有检查
+        "--inconclusive",         # 🆕 启用不确定的检查（重要！能检测更多空指针）
+        "--library=qt",           # 🆕 启用Qt库支持（关键！理解Qt API）
+        "--library=std",          # 🆕 启用C++标准库支持
+        "--library=posix",        # 🆕 POSIX库支持
+        "--xml",                  # 输出XML格式
+        "--xml-version=2",        # XML版本2
+        "--max-configs=1",        # 只检查一种预处理配置（深度扫描见 config['deep_scan']）
+        "--inline-suppr",         # 允许行内抑制
+        "--suppress=missingInclude",  # 🆕 抑制缺少头文件警告（减少噪音）
+        "--suppress=unmatchedSuppression",  # 🆕 抑制不匹配的抑制警告
+        "--suppress=toomanyconfigs",  # 限制配置数后不再提示配置过多
+        "-j", str(os.cpu_count() or 4)  # 🆕 多线程加速
+    )
     
     def __init__(self, cppcheck_path: str = "cppcheck"):
         self.cppcheck_path = cppcheck_path
-        # 🆕 增强的默认参数
-        self.default_args = [
-            "--enable=all",           # 启用所有检查
-            "--inconclusive",         # 🆕 启用不确定的检查（重要！能检测更多空指针）
-            "--library=qt",           # 🆕 启用Qt库支持（关键！理解Qt API）
-            "--library=std",          # 🆕 启用C++标准库支持
-            "--library=posix",        # 🆕 POSIX库支持
-            "--xml",                  # 输出XML格式
-            "--xml-version=2",        # XML版本2
-            "--force",                # 强制检查所有配置
-            "--inline-suppr",         # 允许行内抑制
-            "--suppress=missingInclude",  # 🆕 抑制缺少头文件警告（减少噪音）
-            "--suppress=unmatchedSuppression",  # 🆕 抑制不匹配的抑制警告
-            "-j", str(os.cpu_count() or 4)  # 🆕 多线程加速
-        ]
         
     async def analyze(self, project_path: str, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """执行Cppcheck分析
@@ -49,12 +60,15 @@ class CppcheckWrapper:
             log_info(f"开始Cppcheck分析 (增强模式): {project_path}")
             
             # 构建命令参数
-            cmd_args = [self.cppcheck_path] + self.default_args
+            cmd_args = [self.cppcheck_path, *self.default_args]
             
             # 🆕 支持自定义配置覆盖
             if config:
                 if config.get('enable_verbose'):
                     cmd_args.append('--verbose')
+                # 深度扫描：检查多种 #ifdef 配置，耗时成倍增加
+                if config.get('deep_scan'):
+                    cmd_args.extend(['--force', '--max-configs=12'])
                 if config.get('max_configs'):
                     cmd_args.extend(['--max-configs', str(config['max_configs'])])
                 # 自定义抑制规则
@@ -66,21 +80,25 @@ class CppcheckWrapper:
             
             log_info(f"🔍 Cppcheck命令: {' '.join(cmd_args[:5])}... (共{len(cmd_args)}个参数)")
             
-            # 执行Cppcheck
+            # 执行Cppcheck（stdout只有进度信息，直接丢弃）
             process = await asyncio.create_subprocess_exec(
                 *cmd_args,
-                stdout=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.DEVNULL,
                 stderr=asyncio.subprocess.PIPE
             )
             
+            # Cppcheck输出结果在stderr中，边读取边解析，内存占用与输出大小无关
+            include_raw = bool(config and config.get('include_raw_output', False))
+            
             # 🆕 增加超时控制
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(), 
+                issues, raw_output, has_output = await asyncio.wait_for(
+                    self._stream_cppcheck_output(process, include_raw),
                     timeout=600  # 10分钟超时
                 )
             except asyncio.TimeoutError:
                 process.kill()
+                await process.wait()
                 log_error("Cppcheck分析超时 (10分钟)")
                 return {
                     'success': False,
@@ -88,29 +106,33 @@ class CppcheckWrapper:
                     'issues': []
                 }
             
-            # Cppcheck输出结果在stderr中
-            if stderr:
-                issues = self._parse_cppcheck_xml(stderr.decode('utf-8', errors='ignore'))
+            if has_output:
                 
                 # 🆕 统计并分类问题
-                null_pointer_issues = [i for i in issues if 'null' in i.get('category', '').lower() 
-                                      or 'nullptr' in i.get('message', '').lower()]
+                null_pointer_count = sum(
+                    1 for i in issues
+                    if 'null' in i.get('category', '').lower()
+                    or 'nullptr' in i.get('message', '').lower()
+                )
                 
                 log_info(f"✅ Cppcheck分析完成，发现 {len(issues)} 个问题")
-                if null_pointer_issues:
-                    log_info(f"   其中空指针相关: {len(null_pointer_issues)} 个")
+                if null_pointer_count:
+                    log_info(f"   其中空指针相关: {null_pointer_count} 个")
                 
-                return {
+                result = {
                     'success': True,
                     'tool': 'cppcheck',
                     'issues': issues,
                     'statistics': {  # 🆕 添加统计信息
                         'total': len(issues),
-                        'null_pointer_related': len(null_pointer_issues),
+                        'null_pointer_related': null_pointer_count,
                         'by_severity': self._count_by_severity(issues)
-                    },
-                    'raw_output': stderr.decode('utf-8', errors='ignore')
+                    }
                 }
+                # 原始输出可能有数十MB，仅在配置要求时才保留附带
+                if include_raw:
+                    result['raw_output'] = raw_output
+                return result
             else:
                 log_info("✅ Cppcheck分析完成，未发现问题")
                 return {
@@ -128,6 +150,66 @@ class CppcheckWrapper:
                 'issues': []
             }
     
+    async def _stream_cppcheck_output(
+        self, process: asyncio.subprocess.Process, include_raw: bool
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], bool]:
+        """🆕 分块读取stderr并增量解析XML
+        输入：Cppcheck进程；是否保留原始输出
+        输出：(问题列表, 原始输出文本或None, 是否有输出)
+        """
+        # 与整体 decode('utf-8', errors='ignore') 一致，跨块的多字节字符由增量解码器处理
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        parser = None
+        parse_failed = False
+        pending = ''          # XML头出现之前的文本
+        raw_parts = [] if include_raw else None
+        has_output = False
+        issues = []
+        
+        while True:
+            chunk = await process.stderr.read(_READ_CHUNK_SIZE)
+            has_output = has_output or bool(chunk)
+            text = decoder.decode(chunk, final=not chunk)
+            if raw_parts is not None:
+                raw_parts.append(text)
+            
+            if parser is None and text:
+                # 跳过XML头之前的非XML输出
+                search_from = max(0, len(pending) - len('<?xml') + 1)
+                pending += text
+                xml_start = pending.find('<?xml', search_from)
+                if xml_start != -1:
+                    parser = ET.XMLPullParser(events=('end',))
+                    text = pending[xml_start:]
+                    pending = ''
+            
+            if parser is not None and not parse_failed:
+                try:
+                    if text:
+                        parser.feed(text)
+                    if not chunk:
+                        parser.close()
+                    self._collect_errors(parser.read_events(), issues)
+                except ET.ParseError as e:
+                    # 保留已解析的问题，剩余输出只读取不再解析
+                    log_error(f"XML解析失败: {str(e)}")
+                    parse_failed = True
+                except Exception as e:
+                    log_error(f"处理Cppcheck输出异常: {str(e)}")
+                    parse_failed = True
+            
+            if not chunk:
+                break
+        
+        await process.wait()
+        
+        if parser is None and pending:
+            # 非XML输出（备用方案）
+            issues = self._parse_cppcheck_text(pending)
+        
+        raw_output = ''.join(raw_parts) if raw_parts is not None else None
+        return issues, raw_output, has_output
+    
     async def _check_cppcheck_available(self) -> bool:
         """检查Cppcheck是否可用"""
         try:
@@ -166,58 +248,43 @@ class CppcheckWrapper:
         except:
             return False
     
-    def _parse_cppcheck_xml(self, xml_output: str) -> List[Dict[str, Any]]:
-        """解析Cppcheck XML输出"""
-        issues = []
-        
-        try:
-            # 提取XML部分
-            xml_start = xml_output.find('<?xml')
-            if xml_start == -1:
-                return self._parse_cppcheck_text(xml_output)
+    def _collect_errors(self, events, issues: List[Dict[str, Any]]):
+        """处理解析事件中已完整的<error>元素，转换后追加到issues并释放元素"""
+        for _, error in events:
+            if error.tag != 'error':
+                continue
             
-            xml_content = xml_output[xml_start:]
-            root = ET.fromstring(xml_content)
+            error_id = error.get('id', '')
+            severity = error.get('severity', 'info')
+            message = error.get('msg', '')
             
-            for error in root.findall('.//error'):
-                error_id = error.get('id', '')
-                severity = error.get('severity', 'info')
-                message = error.get('msg', '')
-                
-                issue = {
-                    'id': error_id,
-                    'severity': self._map_severity(severity),
-                    'message': message,
-                    'category': error_id,
-                    'tool': 'cppcheck',
-                    'verbose': error.get('verbose', message),  # 🆕 详细信息
-                }
-                
-                # 🆕 标记空指针相关问题
-                if any(keyword in error_id.lower() for keyword in 
-                       ['null', 'nullptr', 'dereference', 'uninit']):
-                    issue['tags'] = ['null_pointer_risk']
-                    issue['priority'] = 'high'  # 提高优先级
-                
-                # 获取位置信息
-                location = error.find('location')
-                if location is not None:
-                    issue.update({
-                        'file': location.get('file', ''),
-                        'line': int(location.get('line', 0)),
-                        'column': int(location.get('column', 0)) if location.get('column') else None,
-                        'info': location.get('info', '')  # 🆕 额外信息
-                    })
-                
-                issues.append(issue)
-        
-        except ET.ParseError as e:
-            log_error(f"XML解析失败: {str(e)}")
-            return self._parse_cppcheck_text(xml_output)
-        except Exception as e:
-            log_error(f"处理Cppcheck输出异常: {str(e)}")
-        
-        return issues
+            issue = {
+                'id': error_id,
+                'severity': self._map_severity(severity),
+                'message': message,
+                'category': error_id,
+                'tool': 'cppcheck',
+                'verbose': error.get('verbose', message),  # 🆕 详细信息
+            }
+            
+            # 🆕 标记空指针相关问题
+            if any(keyword in error_id.lower() for keyword in 
+                   ['null', 'nullptr', 'dereference', 'uninit']):
+                issue['tags'] = ['null_pointer_risk']
+                issue['priority'] = 'high'  # 提高优先级
+            
+            # 获取位置信息（必须在clear()之前读取子元素）
+            location = error.find('location')
+            if location is not None:
+                issue.update({
+                    'file': location.get('file', ''),
+                    'line': int(location.get('line', 0)),
+                    'column': int(location.get('column', 0)) if location.get('column') else None,
+                    'info': location.get('info', '')  # 🆕 额外信息
+                })
+            
+            issues.append(issue)
+            error.clear()
     
     def _parse_cppcheck_text(self, text_output: str) -> List[Dict[str, Any]]:
         """解析Cppcheck文本输出（备用方案）"""
@@ -229,9 +296,14 @@ class CppcheckWrapper:
                 try:
                     parts = line.split(':', 3)
                     if len(parts) >= 3:
+                        # 格式正确的输出占绝大多数，直接int()转换，失败再取0
+                        try:
+                            line_num = int(parts[1])
+                        except ValueError:
+                            line_num = 0
                         issue = {
                             'file': parts[0].strip() if len(parts) > 0 else '',
-                            'line': int(parts[1].strip()) if parts[1].strip().isdigit() else 0,
+                            'line': line_num,
                             'severity': 'medium',
                             'message': parts[-1].strip() if len(parts) > 2 else line,
                             'category': 'cppcheck_text',
@@ -259,7 +331,5 @@ class CppcheckWrapper:
     def _count_by_severity(self, issues: List[Dict]) -> Dict[str, int]:
         """🆕 统计各严重度数量"""
         counts = {'high': 0, 'medium': 0, 'low': 0, 'info': 0}
-        for issue in issues:
-            severity = issue.get('severity', 'info')
-            counts[severity] = counts.get(severity, 0) + 1
+        counts.update(Counter(issue.get('severity', 'info') for issue in issues))
         return counts
@@ -7,7 +7,10 @@ from typing import Dict, Any
 from utils.logger import log_info, log_error
 
 class FlawfinderWrapper:
-    """Flawfinder 安全漏洞扫描封装"""
+    """Flawfinder 安全漏洞扫描封装
+
+    无实例状态，可与其他分析工具并发运行
+    """
 
     async def analyze(self, project_path: str) -> Dict[str, Any]:
         issues = []
@@ -35,16 +38,24 @@ class FlawfinderWrapper:
             
             if start_idx < len(lines):
                 csv_content = "\n".join(lines[start_idx:])
-                reader = csv.DictReader(io.StringIO(csv_content))
-                for row in reader:
-                    issues.append({
-                        "file": row.get('File'),
-                        "line": int(row.get('Line', 0)),
-                        "severity": "high" if int(row.get('Level', 1)) >= 4 else "medium",
-                        "message": row.get('Warning', '') + " (" + row.get('Suggestion', '') + ")",
-                        "tool": "flawfinder",
-                        "category": "security"
-                    })
+                reader = csv.reader(io.StringIO(csv_content))
+                header = next(reader, None)
+                if header:
+                    # 列下标只在表头解析一次，逐行按下标取值
+                    file_idx, line_idx, level_idx, warning_idx, suggestion_idx = (
+                        header.index(name) for name in ('File', 'Line', 'Level', 'Warning', 'Suggestion')
+                    )
+                    for row in reader:
+                        if not row:
+                            continue
+                        issues.append({
+                            "file": row[file_idx],
+                            "line": int(row[line_idx]),
+                            "severity": "high" if int(row[level_idx]) >= 4 else "medium",
+                            "message": row[warning_idx] + " (" + row[suggestion_idx] + ")",
+                            "tool": "flawfinder",
+                            "category": "security"
+                        })
 
             return {"success": True, "issues": issues, "tool_name": "flawfinder"}
 
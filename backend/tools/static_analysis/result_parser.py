@@ -4,11 +4,19 @@
 依赖：utils.logger
 调用关系：被DetectionAgent调用
 """
+import itertools
 import re
-from typing import Dict, List, Any, Optional
+import sys
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple
 from utils.logger import log_info, log_error
 
 
+def _intern(value: Any) -> Any:
+    """字符串驻留（非字符串原样返回）"""
+    return sys.intern(value) if type(value) is str else value
+
+
 class ResultParser:
     def __init__(self):
         self.severity_map = {
@@ -27,17 +35,19 @@ class ResultParser:
         }
         
         # 🆕 新增：定义需要过滤的噪音模式 (针对Qt和编译中间文件)
-        self.ignore_patterns = [
-            r'moc_.*\.cpp',      # Qt元对象编译器生成文件
-            r'qrc_.*\.cpp',      # Qt资源编译器生成文件
-            r'ui_.*\.h',         # Qt界面生成文件
-            r'build/',           # 构建目录
-            r'cmake-build',      # CMake构建目录
-            r'CMakeFiles/',
-            r'\.g\.',            # Go生成文件(如果有)
-            r'CMakeLists\.txt',  # 构建脚本
-            r'Makefile'
+        # 每项为 (模式必含的小写字面量片段, 路径正则)，两者在同一处维护
+        noise_path_rules = [
+            ('moc_', r'moc_.*\.cpp'),                      # Qt元对象编译器生成文件
+            ('qrc_', r'qrc_.*\.cpp'),                      # Qt资源编译器生成文件
+            ('ui_', r'ui_.*\.h'),                          # Qt界面生成文件
+            ('build/', r'build/'),                         # 构建目录
+            ('cmake-build', r'cmake-build'),               # CMake构建目录
+            ('cmakefiles/', r'CMakeFiles/'),
+            ('.g.', r'\.g\.'),                             # Go生成文件(如果有)
+            ('cmakelists.txt', r'CMakeLists\.txt'),        # 构建脚本
+            ('makefile', r'Makefile')
         ]
+        self.ignore_patterns = [pattern for _, pattern in noise_path_rules]
         
         # 🆕 新增：定义需要忽略的特定错误消息 (环境配置相关噪音)
         self.ignore_messages = [
@@ -47,6 +57,19 @@ class ResultParser:
             "clang-diagnostic-error",   # Clang编译环境错误
             "too many errors emitted"   # 错误过多提示
         ]
+        
+        # 问题ID序号（整个解析器内单调递增，保证ID唯一）
+        self._issue_seq = itertools.count()
+        
+        # 噪音判断对每个问题都要执行，黑名单预编译为单个交替正则
+        self._noise_path_re = re.compile(
+            '|'.join(f'(?:{p})' for p in self.ignore_patterns), re.IGNORECASE
+        )
+        self._noise_msg_re = re.compile(
+            '|'.join(re.escape(m) for m in self.ignore_messages), re.IGNORECASE
+        )
+        # 路径中一个字面量片段都没有时不可能命中正则，绝大多数用户源文件据此直接跳过正则匹配
+        self._noise_stems = frozenset(stem for stem, _ in noise_path_rules)
 
     def parse_and_merge(
         self, 
@@ -87,12 +110,8 @@ class ResultParser:
                 
                 log_info(f"解析 {tool_name} 结果: {len(issues)} -> {len(parsed_issues)} (过滤后)")
             
-            # 去重和排序
-            deduplicated_issues = self._deduplicate_issues(all_issues)
-            sorted_issues = self._sort_issues_by_priority(deduplicated_issues)
-            
-            # 生成统计信息
-            statistics = self._generate_statistics(sorted_issues)
+            # 去重、统计（单遍）和排序
+            sorted_issues, statistics = self._merge_issues(all_issues)
             
             return {
                 'total_issues': len(sorted_issues),
@@ -115,16 +134,15 @@ class ResultParser:
     
     def _is_noise(self, file_path: str, message: str) -> bool:
         """🆕 判断是否为噪音数据"""
-        # 1. 检查文件路径黑名单
-        for pattern in self.ignore_patterns:
-            if re.search(pattern, file_path, re.IGNORECASE):
-                return True
+        # 1. 检查文件路径黑名单（先用字面量片段快速排除）
+        lower_path = file_path.lower()
+        if any(stem in lower_path for stem in self._noise_stems) \
+                and self._noise_path_re.search(file_path):
+            return True
                 
         # 2. 检查错误消息黑名单
-        msg_lower = message.lower()
-        for ignore_msg in self.ignore_messages:
-            if ignore_msg.lower() in msg_lower:
-                return True
+        if self._noise_msg_re.search(message):
+            return True
                 
         # 3. 过滤系统绝对路径报错 (如 /usr/include, /opt)
         # 我们只关心用户上传目录下的代码
@@ -138,6 +156,8 @@ class ResultParser:
     def _parse_tool_issues(self, tool_name: str, issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """解析特定工具的问题列表"""
         parsed_issues = []
+        # 工具名、类别、文件路径等在大量问题间重复，驻留后共享同一字符串对象
+        tool_name = sys.intern(tool_name)
         
         for i, issue_data in enumerate(issues):
             try:
@@ -151,13 +171,15 @@ class ResultParser:
                 # 处理 Flawfinder 的数值型 severity
                 raw_severity = issue_data.get('severity', 'info')
                 
+                category = issue_data.get('category', 'code_quality') # 默认类别
+                
                 parsed_issue = {
-                    'id': f"{tool_name}_{i}_{hash(str(issue_data)) % 10000}",
-                    'file': file_path,
+                    'id': f"{tool_name}_{i}_{next(self._issue_seq)}",
+                    'file': _intern(file_path),
                     'line': issue_data.get('line', 0),
                     'column': issue_data.get('column'),
                     'severity': self._normalize_severity(raw_severity),
-                    'category': issue_data.get('category', 'code_quality'), # 默认类别
+                    'category': _intern(category),
                     'message': message,
                     'tool': tool_name
                 }
@@ -202,58 +224,57 @@ class ResultParser:
             return 'low'
             
         severity_lower = str(severity).lower()
-        return self.severity_map.get(severity_lower, 'medium')
+        return sys.intern(self.severity_map.get(severity_lower, 'medium'))
     
-    def _deduplicate_issues(self, issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """去除重复的问题 (增强版：允许不同工具报同一行，但去除完全重复项)"""
+    def _merge_issues(self, issues: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        去重并生成统计信息（单遍完成），再原地按优先级排序
+        
+        去重允许不同工具报同一行，只去除同一工具的完全重复项
+        """
         seen = set()
         deduplicated = []
+        severity_counts = Counter()
+        category_counts = Counter()
+        file_counts = Counter()
+        tool_counts = Counter()
         
         for issue in issues:
             # Key: 文件 + 行号 + 工具 + 消息摘要
             # 这样如果两个工具都报了同一行，我们都保留（因为视角不同）
             # 但如果同一个工具对同一行报了两次一样的，就去重
-            key = (issue['file'], issue['line'], issue['tool'], issue['message'][:50])
+            # 消息摘要只保存前50个字符的哈希值，集合中不再长期持有切片字符串
+            key = (issue['file'], issue['line'], issue['tool'], hash(issue['message'][:50]))
+            if key in seen:
+                continue
+            seen.add(key)
+            deduplicated.append(issue)
             
-            if key not in seen:
-                seen.add(key)
-                deduplicated.append(issue)
+            severity_counts[issue['severity']] += 1
+            category_counts[issue['category']] += 1
+            file_counts[issue['file']] += 1
+            tool_counts[issue['tool']] += 1
         
-        return deduplicated
-    
-    def _sort_issues_by_priority(self, issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """按优先级排序问题"""
+        # 按优先级排序
         severity_priority = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3, 'info': 4}
-        
-        return sorted(issues, key=lambda x: (
+        deduplicated.sort(key=lambda x: (
             severity_priority.get(x['severity'], 4),
             x['file'],
             x['line']
         ))
-    
-    def _generate_statistics(self, issues: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """生成统计信息"""
-        stats = {
-            'severity_distribution': {'critical': 0, 'high': 0, 'medium': 0, 'low': 0, 'info': 0},
-            'category_distribution': {},
-            'file_distribution': {},
-            'tool_distribution': {}
-        }
         
-        for issue in issues:
-            sev = issue['severity']
-            # 容错：如果sev不在默认key里，设为medium
-            if sev not in stats['severity_distribution']:
+        severity_distribution = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0, 'info': 0}
+        for sev, count in severity_counts.items():
+            # 容错：如果sev不在默认key里，计入medium
+            if sev not in severity_distribution:
                 sev = 'medium'
-            stats['severity_distribution'][sev] += 1
-            
-            category = issue['category']
-            stats['category_distribution'][category] = stats['category_distribution'].get(category, 0) + 1
-            
-            file_path = issue['file']
-            stats['file_distribution'][file_path] = stats['file_distribution'].get(file_path, 0) + 1
-            
-            tool = issue['tool']
-            stats['tool_distribution'][tool] = stats['tool_distribution'].get(tool, 0) + 1
+            severity_distribution[sev] += count
+        
+        statistics = {
+            'severity_distribution': severity_distribution,
+            'category_distribution': dict(category_counts),
+            'file_distribution': dict(file_counts),
+            'tool_distribution': dict(tool_counts)
+        }
         
-        return stats
+        return deduplicated, statistics
@@ -5,16 +5,34 @@
 """
 import os
 import yaml
+from collections import defaultdict
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 
 from utils.logger import log_info, log_error
 from config import settings  # ✅ 修复导入
 
+try:
+    from yaml import CSafeLoader as _Loader  # libyaml 的 C 实现
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+
+@lru_cache(maxsize=4)
+def _load_rules_cached(path: str, mtime: float) -> Dict[str, Any]:
+    """按 (路径, 修改时间) 缓存解析结果；文件修改后 mtime 变化，自动重新加载
+    返回的字典在各 RuleEngine 实例间共享，只读使用
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_Loader) or {}
+
 class RuleEngine:
     """规则引擎 - 管理静态分析规则"""
     
     def __init__(self):
         self.rules = {}
+        self._ignore_by_key: Dict[str, set] = {}
+        self._ignore_fallback: List[tuple] = []
         self.rule_file = os.path.join("configs", "static_rules.yaml")
         self.load_rules()
     
@@ -22,8 +40,7 @@ class RuleEngine:
         """加载规则配置"""
         try:
             if os.path.exists(self.rule_file):
-                with open(self.rule_file, 'r', encoding='utf-8') as f:
-                    self.rules = yaml.safe_load(f) or {}
+                self.rules = _load_rules_cached(self.rule_file, os.path.getmtime(self.rule_file))
                 log_info(f"加载规则配置: {len(self.rules)} 条规则")
             else:
                 self.rules = self._get_default_rules()
@@ -32,6 +49,24 @@ class RuleEngine:
         except Exception as e:
             log_error(f"加载规则配置失败: {str(e)}")
             self.rules = self._get_default_rules()
+        
+        self._build_ignore_index()
+    
+    def _build_ignore_index(self) -> None:
+        """将忽略规则展开为 字段 -> 取值集合 的索引
+        任一规则的任一字段相等即忽略，因此所有 (字段, 值) 可合并为并集；
+        不可哈希的取值放入回退列表逐个比较
+        """
+        ignore_by_key = defaultdict(set)
+        fallback = []
+        for rule in self.rules.get('ignore_rules', []) or []:
+            for key, value in rule.items():
+                try:
+                    ignore_by_key[key].add(value)
+                except TypeError:
+                    fallback.append((key, value))
+        self._ignore_by_key = dict(ignore_by_key)
+        self._ignore_fallback = fallback
 
 
     
@@ -53,19 +88,19 @@ class RuleEngine:
     
     def should_ignore_issue(self, issue: Dict[str, Any]) -> bool:
         """判断是否应该忽略某个问题"""
-        ignore_rules = self.rules.get('ignore_rules', [])
+        for key, values in self._ignore_by_key.items():
+            if key in issue:
+                try:
+                    if issue[key] in values:
+                        return True
+                except TypeError:
+                    # 问题字段取值不可哈希（如列表），不可能等于集合中的任何值
+                    pass
         
-        for rule in ignore_rules:
-            if self._match_rule(issue, rule):
-                return True
-        
-        return False
-    
-    def _match_rule(self, issue: Dict[str, Any], rule: Dict[str, Any]) -> bool:
-        """匹配规则"""
-        for key, value in rule.items():
+        for key, value in self._ignore_fallback:
             if key in issue and issue[key] == value:
                 return True
+        
         return False
     
     def _get_default_rules(self) -> Dict[str, Any]:
@@ -1,72 +1,162 @@
-import matplotlib
-import matplotlib.pyplot as plt
-from typing import Dict, List, Any
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Union
 import logging
 from pathlib import Path
 
-# ✅ 配置中文字体支持
-matplotlib.use("Agg")  # 非GUI后端
-plt.rcParams["font.sans-serif"] = ["WenQuanYi Micro Hei", "DejaVu Sans", "Arial"]
-plt.rcParams["axes.unicode_minus"] = False  # 解决负号显示问题
-
 logger = logging.getLogger(__name__)
 
+# matplotlib.pyplot（连带字体管理器）导入耗时数秒，推迟到第一次生成图表时
+_plt = None
 
-class ChartGenerator:
-    """图表生成器"""
 
-    def __init__(self):
-        self._configure_fonts()
+def _get_plt():
+    """延迟导入并初始化 matplotlib.pyplot"""
+    global _plt
+    if _plt is None:
+        import matplotlib
 
-    def _configure_fonts(self):
-        """配置matplotlib中文字体"""
-        try:
-            import matplotlib.font_manager as fm
+        matplotlib.use("Agg")  # 非GUI后端
+        import matplotlib.pyplot as plt
 
-            # 清除字体缓存
-            fm._load_fontmanager(try_read_cache=False)
+        # ✅ 配置中文字体支持
+        plt.rcParams["font.sans-serif"] = ["WenQuanYi Micro Hei", "DejaVu Sans", "Arial"]
+        plt.rcParams["axes.unicode_minus"] = False  # 解决负号显示问题
+        _plt = plt
+    return _plt
 
-            # 查找中文字体
-            chinese_fonts = [
-                "WenQuanYi Micro Hei",
-                "WenQuanYi Zen Hei",
-                "Noto Sans CJK SC",
-                "SimHei",
-                "Microsoft YaHei",
-            ]
+# 候选中文字体（按优先级）
+CHINESE_FONTS = [
+    "WenQuanYi Micro Hei",
+    "WenQuanYi Zen Hei",
+    "Noto Sans CJK SC",
+    "SimHei",
+    "Microsoft YaHei",
+]
 
-            font_list = [f.name for f in fm.fontManager.ttflist]
 
-            for font in chinese_fonts:
-                if font in font_list:
-                    plt.rcParams["font.sans-serif"] = [font]
-                    logger.info(f"✅ Using Chinese font: {font}")
-                    return
+@lru_cache(maxsize=1)
+def _pick_chinese_font() -> Optional[str]:
+    """返回第一个可用的中文字体名，没有则返回None（进程内只查找一次）"""
+    import matplotlib.font_manager as fm
 
-            logger.warning("⚠️ No Chinese font found, using default")
+    # fontManager 优先读取磁盘上的字体缓存 fontlist-vXXX.json，不重新扫描系统字体
+    available = {f.name for f in fm.fontManager.ttflist}
+    for font in CHINESE_FONTS:
+        if font in available:
+            return font
+    return None
 
-        except Exception as e:
-            logger.error(f"❌ Failed to configure fonts: {e}")
+
+@lru_cache(maxsize=1024)
+def _file_name(file_path: str) -> str:
+    """按路径缓存的文件名，同一文件的大量问题只解析一次路径"""
+    return Path(file_path).name
+
+
+@lru_cache(maxsize=1)
+def _configure_fonts() -> None:
+    """配置matplotlib中文字体（rcParams 为进程全局设置，只需配置一次）"""
+    try:
+        plt = _get_plt()
+        font = _pick_chinese_font()
+        if font:
+            plt.rcParams["font.sans-serif"] = [font]
+            logger.info(f"✅ Using Chinese font: {font}")
+            return
+
+        logger.warning("⚠️ No Chinese font found, using default")
+
+    except Exception as e:
+        logger.error(f"❌ Failed to configure fonts: {e}")
+
+
+# 图表渲染进程池（matplotlib 非线程安全，用进程池而不是线程池），首次使用时创建
+_render_pool: Optional[ProcessPoolExecutor] = None
+
+# 工作进程内缓存的生成器（按dpi），进程内的多次渲染复用同一个Figure
+_worker_generators: Dict[int, "ChartGenerator"] = {}
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    """获取（必要时创建）图表渲染进程池"""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=3)
+    return _render_pool
+
+
+def _render_chart(method_name: str, dpi: int, *args) -> str:
+    """在工作进程中渲染图表（顶层函数，可被pickle）"""
+    generator = _worker_generators.get(dpi)
+    if generator is None:
+        generator = _worker_generators[dpi] = ChartGenerator(dpi=dpi)
+    return getattr(generator, method_name)(*args)
+
+
+class ChartGenerator:
+    """图表生成器"""
+
+    # 严重度标签与配色
+    _SEVERITY_LABELS = {
+        "critical": "严重",
+        "high": "高危",
+        "medium": "中危",
+        "low": "低危",
+    }
+    _SEVERITY_COLORS = {
+        "critical": "#dc3545",
+        "high": "#fd7e14",
+        "medium": "#ffc107",
+        "low": "#17a2b8",
+    }
+
+    # 工具显示名称与柱状图配色
+    _TOOL_NAMES = {
+        "cppcheck": "Cppcheck",
+        "asan": "AddressSanitizer",
+        "valgrind_memcheck": "Valgrind Memcheck",
+        "memory_pool_specialized": "内存池专项",
+    }
+    _TOOL_COLOR_MAP = ("#007bff", "#28a745", "#dc3545", "#ffc107")
+
+    def __init__(self, dpi: int = 150):
+        # 输出分辨率：屏幕展示150足够，打印质量的报告可传入300
+        self.dpi = dpi
+        # 各图表复用同一个Figure（绕过pyplot的图形注册/关闭开销）
+        self._figure = None
+        _configure_fonts()
+
+    def _submit(self, method_name: str, *args) -> Future:
+        """把图表渲染提交到进程池，返回结果为输出路径的Future"""
+        return _get_render_pool().submit(_render_chart, method_name, self.dpi, *args)
+
+    def _new_axes(self, figsize):
+        """清空复用的Figure，按尺寸重新添加一个坐标轴"""
+        if self._figure is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            self._figure = Figure(figsize=figsize)
+            FigureCanvasAgg(self._figure)
+        else:
+            self._figure.clear()
+            self._figure.set_size_inches(figsize)
+        return self._figure, self._figure.add_subplot(111)
 
     def generate_severity_distribution_chart(
-        self, severity_dist: Dict[str, int], output_path: str
-    ) -> str:
-        """生成严重度分布饼图"""
+        self, severity_dist: Dict[str, int], output_path: str, blocking: bool = True
+    ) -> Union[str, Future]:
+        """生成严重度分布饼图（blocking=False 时在进程池中渲染并返回Future）"""
+        if not blocking:
+            return self._submit(
+                "generate_severity_distribution_chart", severity_dist, output_path
+            )
         try:
             # 数据准备
-            labels = {
-                "critical": "严重",
-                "high": "高危",
-                "medium": "中危",
-                "low": "低危",
-            }
-
-            colors = {
-                "critical": "#dc3545",
-                "high": "#fd7e14",
-                "medium": "#ffc107",
-                "low": "#17a2b8",
-            }
+            labels = self._SEVERITY_LABELS
+            colors = self._SEVERITY_COLORS
 
             data = []
             label_list = []
@@ -83,7 +173,7 @@ class ChartGenerator:
                 return ""
 
             # 创建图表
-            fig, ax = plt.subplots(figsize=(10, 6))
+            fig, ax = self._new_axes((10, 6))
 
             wedges, texts, autotexts = ax.pie(
                 data,
@@ -103,9 +193,8 @@ class ChartGenerator:
 
             ax.set_title("缺陷严重度分布", fontsize=16, pad=20)
 
-            plt.tight_layout()
-            plt.savefig(output_path, dpi=300, bbox_inches="tight")
-            plt.close()
+            fig.tight_layout()
+            fig.savefig(output_path, dpi=self.dpi)
 
             logger.info(f"✅ Severity chart generated: {output_path}")
             return output_path
@@ -115,26 +204,23 @@ class ChartGenerator:
             return ""
 
     def generate_tool_comparison_chart(
-        self, tool_stats: Dict[str, int], output_path: str
-    ) -> str:
-        """生成工具对比柱状图"""
+        self, tool_stats: Dict[str, int], output_path: str, blocking: bool = True
+    ) -> Union[str, Future]:
+        """生成工具对比柱状图（blocking=False 时在进程池中渲染并返回Future）"""
+        if not blocking:
+            return self._submit("generate_tool_comparison_chart", tool_stats, output_path)
         try:
             if not tool_stats:
                 logger.warning("No data for tool comparison chart")
                 return ""
 
             # 数据准备
-            tool_names = {
-                "cppcheck": "Cppcheck",
-                "asan": "AddressSanitizer",
-                "valgrind_memcheck": "Valgrind Memcheck",
-                "memory_pool_specialized": "内存池专项",
-            }
+            tool_names = self._TOOL_NAMES
+            color_map = self._TOOL_COLOR_MAP
 
             tools = []
             counts = []
             colors = []
-            color_map = ["#007bff", "#28a745", "#dc3545", "#ffc107"]
 
             for i, (tool, count) in enumerate(tool_stats.items()):
                 tools.append(tool_names.get(tool, tool))
@@ -142,7 +228,7 @@ class ChartGenerator:
                 colors.append(color_map[i % len(color_map)])
 
             # 创建图表
-            fig, ax = plt.subplots(figsize=(10, 6))
+            fig, ax = self._new_axes((10, 6))
 
             bars = ax.bar(tools, counts, color=colors, alpha=0.8)
 
@@ -163,10 +249,9 @@ class ChartGenerator:
             ax.set_title("工具检测效果对比", fontsize=16, pad=20)
             ax.grid(axis="y", alpha=0.3)
 
-            plt.xticks(rotation=15, ha="right")
-            plt.tight_layout()
-            plt.savefig(output_path, dpi=300, bbox_inches="tight")
-            plt.close()
+            _get_plt().setp(ax.get_xticklabels(), rotation=15, ha="right")
+            fig.tight_layout()
+            fig.savefig(output_path, dpi=self.dpi)
 
             logger.info(f"✅ Tool comparison chart generated: {output_path}")
             return output_path
@@ -176,26 +261,27 @@ class ChartGenerator:
             return ""
 
     def generate_file_heatmap(
-        self, issues: List[Dict[str, Any]], output_path: str, top_n: int = 15
-    ) -> str:
-        """生成文件问题热力图"""
+        self,
+        issues: List[Dict[str, Any]],
+        output_path: str,
+        top_n: int = 15,
+        blocking: bool = True,
+    ) -> Union[str, Future]:
+        """生成文件问题热力图（blocking=False 时在进程池中渲染并返回Future）"""
+        if not blocking:
+            return self._submit("generate_file_heatmap", issues, output_path, top_n)
         try:
             if not issues:
                 logger.warning("No issues for file heatmap")
                 return ""
 
-            # 统计每个文件的问题数
-            file_counts = {}
-            for issue in issues:
-                file_path = issue.get("file", "unknown")
-                # 只保留文件名
-                file_name = Path(file_path).name
-                file_counts[file_name] = file_counts.get(file_name, 0) + 1
+            # 统计每个文件的问题数（只保留文件名）
+            file_counts = Counter(
+                _file_name(issue.get("file", "unknown")) for issue in issues
+            )
 
-            # 排序并取前N个
-            sorted_files = sorted(
-                file_counts.items(), key=lambda x: x[1], reverse=True
-            )[:top_n]
+            # 取问题数最多的前N个（堆选择，计数相同时保持首次出现顺序）
+            sorted_files = file_counts.most_common(top_n)
 
             if not sorted_files:
                 return ""
@@ -204,10 +290,10 @@ class ChartGenerator:
             counts = [f[1] for f in sorted_files]
 
             # 创建图表
-            fig, ax = plt.subplots(figsize=(10, max(6, len(files) * 0.4)))
+            fig, ax = self._new_axes((10, max(6, len(files) * 0.4)))
 
             # 颜色映射（问题越多颜色越深）
-            colors = plt.cm.Reds([0.3 + (c / max(counts)) * 0.6 for c in counts])
+            colors = _get_plt().cm.Reds([0.3 + (c / max(counts)) * 0.6 for c in counts])
 
             bars = ax.barh(files, counts, color=colors)
 
@@ -225,9 +311,8 @@ class ChartGenerator:
             ax.set_title(f"文件问题热力图 (Top {len(files)})", fontsize=16, pad=20)
             ax.grid(axis="x", alpha=0.3)
 
-            plt.tight_layout()
-            plt.savefig(output_path, dpi=300, bbox_inches="tight")
-            plt.close()
+            fig.tight_layout()
+            fig.savefig(output_path, dpi=self.dpi)
 
             logger.info(f"✅ File heatmap generated: {output_path}")
             return output_path
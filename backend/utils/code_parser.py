@@ -4,20 +4,61 @@
 调用关系：被FileAnalyzerAgent调用
 """
 import re
-from typing import Dict, List, Any, Optional
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from utils.logger import log_info, log_error
 
 
+@lru_cache(maxsize=4)
+def _line_starts(content: str) -> Tuple[int, ...]:
+    """按内容缓存行首偏移表（第i项为第i+1行起始偏移），类与函数提取共用"""
+    starts = [0]
+    find = content.find
+    pos = find('\n')
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = find('\n', pos + 1)
+    return tuple(starts)
+
+
+# str.splitlines() 识别的换行符（文本模式读取时 '\r' 已统一转换为 '\n'）
+_LINE_BREAKS = ('\n', '\v', '\f', '\x1c', '\x1d', '\x1e', '\x85', '\u2028', '\u2029')
+
+
+def _count_lines(content: str) -> int:
+    """与 len(content.splitlines()) 结果相同，但只计数、不构建行列表"""
+    if not content:
+        return 0
+    breaks = sum(content.count(ch) for ch in _LINE_BREAKS)
+    # 最后一行没有换行符结尾时也算一行
+    return breaks if content[-1] in _LINE_BREAKS else breaks + 1
+
+
 class CodeParser:
     """代码解析工具"""
     
+    # C++关键字（作为"返回类型"出现时不是函数定义）
+    CPP_KEYWORDS = frozenset({
+        'class', 'struct', 'namespace', 'template', 'typedef',
+        'public', 'private', 'protected', 'virtual', 'static',
+        'const', 'inline', 'friend', 'operator'
+    })
+    
+    # 每个文件都要执行的匹配模式，类定义时预编译
+    _INCLUDE_RE = re.compile(r'#include\s*[<"](.*?)[>"]')
+    _CLASS_RE = re.compile(r'class\s+(\w+)(?:\s*:\s*(?:public|private|protected)\s+\w+)?')
+    # 简化的函数匹配模式；关键字开头的候选在正则引擎内用否定前瞻排除
+    _FUNC_RE = re.compile(
+        r'\b(?!(?:' + '|'.join(sorted(CPP_KEYWORDS)) + r')\b)(\w+)\s+(\w+)\s*\([^)]*\)\s*\{'
+    )
+    _NS_RE = re.compile(r'namespace\s+(\w+)')
+    # 控制流关键字（合并为一个正则，一次扫描完成计数）
+    _CONTROL_RE = re.compile(r'\b(?:if|else|while|for|switch|case|catch)\b')
+    
     def __init__(self):
         # C++关键字
-        self.cpp_keywords = [
-            'class', 'struct', 'namespace', 'template', 'typedef',
-            'public', 'private', 'protected', 'virtual', 'static',
-            'const', 'inline', 'friend', 'operator'
-        ]
+        self.cpp_keywords = self.CPP_KEYWORDS
     
     def parse_file(self, file_path: str) -> Dict[str, Any]:
         """解析单个文件
@@ -30,7 +71,7 @@ class CodeParser:
             
             return {
                 'file_path': file_path,
-                'lines_of_code': len(content.splitlines()),
+                'lines_of_code': _count_lines(content),
                 'includes': self.extract_includes(content),
                 'classes': self.extract_classes(content),
                 'functions': self.extract_functions(content),
@@ -46,17 +87,18 @@ class CodeParser:
             }
     def extract_includes(self, content: str) -> List[str]:
         """提取include语句"""
-        include_pattern = r'#include\s*[<"](.*?)[>"]'
-        return re.findall(include_pattern, content)
+        return self._INCLUDE_RE.findall(content)
     
     def extract_classes(self, content: str) -> List[Dict[str, Any]]:
         """提取类定义"""
         classes = []
-        class_pattern = r'class\s+(\w+)(?:\s*:\s*(?:public|private|protected)\s+\w+)?'
+        line_starts = None
         
-        for match in re.finditer(class_pattern, content):
+        for match in self._CLASS_RE.finditer(content):
             class_name = match.group(1)
-            line_num = content[:match.start()].count('\n') + 1
+            if line_starts is None:
+                line_starts = _line_starts(content)
+            line_num = bisect_right(line_starts, match.start())
             
             classes.append({
                 'name': class_name,
@@ -69,60 +111,49 @@ class CodeParser:
     def extract_functions(self, content: str) -> List[Dict[str, Any]]:
         """提取函数定义"""
         functions = []
-        # 简化的函数匹配模式
-        func_pattern = r'(\w+)\s+(\w+)\s*\([^)]*\)\s*{'
+        line_starts = None
         
-        for match in re.finditer(func_pattern, content):
+        for match in self._FUNC_RE.finditer(content):
             return_type = match.group(1)
             func_name = match.group(2)
-            line_num = content[:match.start()].count('\n') + 1
+            if line_starts is None:
+                line_starts = _line_starts(content)
             
-            # 跳过一些C++关键字
-            if return_type not in self.cpp_keywords:
-                functions.append({
-                    'name': func_name,
-                    'return_type': return_type,
-                    'line': line_num
-                })
+            functions.append({
+                'name': func_name,
+                'return_type': return_type,
+                'line': bisect_right(line_starts, match.start())
+            })
         
         return functions
     
     def extract_namespaces(self, content: str) -> List[str]:
         """提取命名空间"""
-        namespace_pattern = r'namespace\s+(\w+)'
-        return re.findall(namespace_pattern, content)
+        return self._NS_RE.findall(content)
     
     def calculate_complexity(self, content: str) -> int:
         """计算代码复杂度"""
-        complexity = 0
-        
-        # 控制流关键字
-        control_keywords = ['if', 'else', 'while', 'for', 'switch', 'case', 'catch']
-        
-        for keyword in control_keywords:
-            complexity += len(re.findall(rf'\b{keyword}\b', content))
-        
-        return complexity
+        # 控制流关键字出现次数
+        return len(self._CONTROL_RE.findall(content))
     
     def get_file_metrics(self, file_path: str) -> Dict[str, Any]:
         """获取文件度量信息"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-            
-            total_lines = len(lines)
-            code_lines = 0
+            total_lines = 0
             comment_lines = 0
             blank_lines = 0
             
-            for line in lines:
-                stripped = line.strip()
-                if not stripped:
-                    blank_lines += 1
-                elif stripped.startswith('//') or stripped.startswith('/*'):
-                    comment_lines += 1
-                else:
-                    code_lines += 1
+            # 逐行流式读取，只保留计数，不把整个文件的行列表留在内存中
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    total_lines += 1
+                    stripped = line.strip()
+                    if not stripped:
+                        blank_lines += 1
+                    elif stripped.startswith(('//', '/*')):
+                        comment_lines += 1
+            
+            code_lines = total_lines - blank_lines - comment_lines
             
             return {
                 'total_lines': total_lines,
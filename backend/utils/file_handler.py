@@ -5,64 +5,116 @@ import shutil
 import zipfile
 import tarfile
 import hashlib
-from typing import List, Tuple, Optional
+import time
+from typing import List, Tuple, Optional, Union
 from pathlib import Path
 
 from config import settings
 from utils.logger import log_info, log_error
 from utils.exceptions import FileUploadError
 
+# 文件哈希分块大小
+HASH_CHUNK_SIZE = 1 << 20
+
+def _new_file_hasher():
+    """文件哈希算法：16字节摘要的BLAKE2b（十六进制32位，与 File.file_hash 列宽一致）"""
+    return hashlib.blake2b(digest_size=16)
+
 def get_file_hash(file_path: str) -> str:
-    """计算文件MD5哈希值"""
-    hash_md5 = hashlib.md5()
+    """计算文件BLAKE2b哈希值"""
     try:
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            if hasattr(hashlib, "file_digest"):
+                # Python 3.11+：在C层循环读取并计算，期间释放GIL
+                return hashlib.file_digest(f, _new_file_hasher).hexdigest()
+            file_hash = _new_file_hasher()
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
     except Exception as e:
         log_error(f"计算文件哈希失败: {str(e)}")
         raise
 
-def extract_archive(archive_path: str, extract_to: str) -> List[str]:
-    """解压缩文件"""
-    extracted_files = []
+def _iter_tar_members(tar_ref: tarfile.TarFile, names: Optional[List[str]], counter: List[int]):
+    """边读取边产出tar成员，同时记录名称/数量（只遍历归档一次）"""
+    for member in tar_ref:
+        counter[0] += 1
+        if names is not None:
+            names.append(member.name)
+        yield member
+
+def extract_archive(archive_path: str, extract_to: str, yield_names: bool = True) -> Union[List[str], int]:
+    """解压缩文件
+    
+    yield_names 为 False 时只返回文件数量，不构建名称列表
+    """
+    names: Optional[List[str]] = [] if yield_names else None
+    counter = [0]
     
     try:
         if archive_path.endswith('.zip'):
             with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_to)
-                extracted_files = zip_ref.namelist()
+                # ZipFile.extract 会去掉绝对路径和 '..'，成员不会写到目标目录之外
+                for info in zip_ref.infolist():
+                    zip_ref.extract(info, extract_to)
+                    counter[0] += 1
+                    if names is not None:
+                        names.append(info.filename)
         elif archive_path.endswith(('.tar', '.tar.gz', '.tgz')):
             with tarfile.open(archive_path, 'r:*') as tar_ref:
-                tar_ref.extractall(extract_to)
-                extracted_files = tar_ref.getnames()
+                members = _iter_tar_members(tar_ref, names, counter)
+                if hasattr(tarfile, 'data_filter'):
+                    # 拒绝绝对路径、越界链接和设备文件等不安全成员
+                    tar_ref.extractall(extract_to, members=members, filter='data')
+                else:
+                    tar_ref.extractall(extract_to, members=members)
         else:
             # 单个文件直接复制
             filename = os.path.basename(archive_path)
             dest_path = os.path.join(extract_to, filename)
             shutil.copy2(archive_path, dest_path)
-            extracted_files = [filename]
+            counter[0] = 1
+            if names is not None:
+                names.append(filename)
         
-        log_info(f"解压文件成功: {len(extracted_files)} 个文件")
-        return extracted_files
+        log_info(f"解压文件成功: {counter[0]} 个文件")
+        return names if yield_names else counter[0]
         
     except Exception as e:
         log_error(f"解压文件失败: {str(e)}")
         raise FileUploadError(f"解压文件失败: {str(e)}")
 
+# C++文件扩展名（小写元组，str.endswith 一次调用即可检查全部扩展名）
+_CPP_EXTS = tuple(ext.lower() for ext in settings.ALLOWED_EXTENSIONS)
+
+def _scan_cpp_files(directory: str, rel_dir: str, cpp_files: List[Tuple[str, str]]):
+    """递归 scandir 收集C++文件（与 os.walk 相同：先当前目录文件再子目录，不进入目录符号链接）"""
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        rel_path = f"{rel_dir}{os.sep}{entry.name}" if rel_dir else entry.name
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            if not entry.is_symlink():
+                subdirs.append((entry.path, rel_path))
+        elif entry.name.lower().endswith(_CPP_EXTS):
+            cpp_files.append((entry.path, rel_path))
+    for sub_path, sub_rel in subdirs:
+        _scan_cpp_files(sub_path, sub_rel, cpp_files)
+
 def find_cpp_files(directory: str) -> List[Tuple[str, str]]:
     """查找C++文件"""
-    cpp_extensions = settings.ALLOWED_EXTENSIONS
     cpp_files = []
     
     try:
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                if any(file.lower().endswith(ext.lower()) for ext in cpp_extensions):
-                    full_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(full_path, directory)
-                    cpp_files.append((full_path, relative_path))
+        _scan_cpp_files(directory, "", cpp_files)
         
         log_info(f"找到 {len(cpp_files)} 个C++文件")
         return cpp_files
@@ -74,18 +126,27 @@ def find_cpp_files(directory: str) -> List[Tuple[str, str]]:
 def clean_temp_files(directory: str, max_age_hours: int = 24):
     """清理临时文件"""
     try:
-        import time
         current_time = time.time()
         max_age_seconds = max_age_hours * 3600
         
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if os.path.isfile(file_path):
-                    file_age = current_time - os.path.getctime(file_path)
+        # 迭代 scandir 遍历（不进入目录符号链接）；DirEntry 自带类型信息，每个文件只需一次 stat
+        pending = [directory]
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        pending.append(entry.path)
+                elif entry.is_file():
+                    file_age = current_time - entry.stat().st_ctime
                     if file_age > max_age_seconds:
-                        os.remove(file_path)
-                        log_info(f"清理临时文件: {file_path}")
+                        os.remove(entry.path)
+                        log_info(f"清理临时文件: {entry.path}")
         
     except Exception as e:
         log_error(f"清理临时文件失败: {str(e)}")
@@ -45,22 +45,12 @@ def setup_logger():
 # 创建全局日志器
 logger = setup_logger()
 
-# 便捷日志函数
-def log_info(message: str, **kwargs):
-    """记录信息日志"""
-    logger.info(message)
-
-def log_error(message: str, **kwargs):
-    """记录错误日志"""
-    logger.error(message)
-
-def log_warning(message: str, **kwargs):
-    """记录警告日志"""
-    logger.warning(message, extra=kwargs)
-
-def log_debug(message: str, **kwargs):
-    """记录调试日志"""
-    logger.debug(message, extra=kwargs)
+# 便捷日志函数：直接绑定到日志器方法，省去一层Python包装调用
+# （支持 logging 的标准关键字参数，如 exc_info=True、extra={...}）
+log_info = logger.info
+log_error = logger.error
+log_warning = logger.warning
+log_debug = logger.debug
 
 def log_analysis_start(project_id: str, file_count: int):
     """记录分析开始"""
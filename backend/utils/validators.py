@@ -5,9 +5,19 @@
 """
 import os
 import re
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 from utils.logger import log_info, log_error
 
+# GLM-4 API密钥格式（\Z 而非 $，不接受末尾换行）
+_API_KEY_RE = re.compile(r'^[a-f0-9]{32}\.[a-zA-Z0-9]{16}\Z')
+
+# 问题记录必需字段与合法严重程度
+_REQUIRED_ISSUE_FIELDS = frozenset({'file', 'line', 'severity', 'message', 'tool'})
+_VALID_SEVERITIES = frozenset({'high', 'medium', 'low', 'info'})
+
+# 报告验证时最多列出的无效问题数
+MAX_ISSUE_ERRORS = 20
+
 
 class ProjectValidator:
     """项目验证器"""
@@ -37,13 +47,14 @@ class ProjectValidator:
             result['errors'].append('项目路径不是目录')
             return result
         
+        # 一次遍历同时收集C++文件和大文件
+        cpp_files, large_files = self._scan_project(project_path)
+        
         # 检查是否包含C++文件
-        cpp_files = self._find_cpp_files(project_path)
         if not cpp_files:
             result['warnings'].append('未找到C++源文件')
         
         # 检查文件大小
-        large_files = self._check_file_sizes(project_path)
         if large_files:
             result['warnings'].append(f'发现{len(large_files)}个大文件，可能影响分析性能')
         
@@ -69,34 +80,44 @@ class ProjectValidator:
         result['valid'] = len(result['errors']) == 0
         return result
     
-    def _find_cpp_files(self, project_path: str) -> List[str]:
-        """查找C++文件"""
+    def _scan_project(self, project_path: str) -> Tuple[List[str], List[str]]:
+        """遍历项目目录一次，返回 (C++文件列表, 大文件列表)"""
         cpp_files = []
-        
-        for root, dirs, files in os.walk(project_path):
-            # 跳过隐藏目录
-            dirs[:] = [d for d in dirs if not d.startswith('.')]
-            
-            for file in files:
-                if any(file.endswith(ext) for ext in self.supported_extensions):
-                    cpp_files.append(os.path.join(root, file))
-        
-        return cpp_files
-    
-    def _check_file_sizes(self, project_path: str) -> List[str]:
-        """检查大文件"""
         large_files = []
+        extensions = tuple(self.supported_extensions)
+        self._scan_dir(project_path, False, extensions, cpp_files, large_files)
+        return cpp_files, large_files
+    
+    def _scan_dir(self, directory: str, in_hidden: bool, extensions: Tuple[str, ...],
+                  cpp_files: List[str], large_files: List[str]):
+        """递归 scandir 一个目录（不进入目录符号链接）
         
-        for root, dirs, files in os.walk(project_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                try:
-                    if os.path.getsize(file_path) > self.max_file_size:
-                        large_files.append(file_path)
-                except:
-                    continue
-        
-        return large_files
+        隐藏目录下的文件不计入C++文件，但仍参与大文件检查
+        """
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            return
+        
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if not entry.is_symlink():
+                    self._scan_dir(entry.path, in_hidden or entry.name.startswith('.'),
+                                   extensions, cpp_files, large_files)
+                continue
+            
+            if not in_hidden and entry.name.endswith(extensions):
+                cpp_files.append(entry.path)
+            try:
+                if entry.stat().st_size > self.max_file_size:
+                    large_files.append(entry.path)
+            except OSError:
+                continue
 
 
 class AnalysisResultValidator:
@@ -119,16 +140,13 @@ class AnalysisResultValidator:
     
     def validate_issue_format(self, issue: Dict[str, Any]) -> bool:
         """验证问题格式"""
-        required_fields = ['file', 'line', 'severity', 'message', 'tool']
-        
-        for field in required_fields:
-            if field not in issue:
-                log_error(f"问题记录缺少字段: {field}")
-                return False
+        if not _REQUIRED_ISSUE_FIELDS.issubset(issue):
+            missing = ', '.join(sorted(_REQUIRED_ISSUE_FIELDS.difference(issue)))
+            log_error(f"问题记录缺少字段: {missing}")
+            return False
         
         # 验证严重程度
-        valid_severities = ['high', 'medium', 'low', 'info']
-        if issue['severity'] not in valid_severities:
+        if issue['severity'] not in _VALID_SEVERITIES:
             log_error(f"无效的严重程度: {issue['severity']}")
             return False
         
@@ -162,9 +180,16 @@ class AnalysisResultValidator:
             if not isinstance(issues, list):
                 result['errors'].append('issues必须是列表')
             else:
+                # 逐条只做一次集合判断和一次查找，不逐条记日志；无效问题过多时提前结束
+                invalid_count = 0
                 for i, issue in enumerate(issues):
-                    if not self.validate_issue_format(issue):
-                        result['errors'].append(f'第{i+1}个问题格式无效')
+                    if _REQUIRED_ISSUE_FIELDS.issubset(issue) and issue['severity'] in _VALID_SEVERITIES:
+                        continue
+                    invalid_count += 1
+                    if invalid_count > MAX_ISSUE_ERRORS:
+                        result['errors'].append(f'无效问题超过{MAX_ISSUE_ERRORS}个，已停止检查')
+                        break
+                    result['errors'].append(f'第{i+1}个问题格式无效')
         
         result['valid'] = len(result['errors']) == 0
         return result
@@ -179,7 +204,7 @@ class ConfigValidator:
             return False
         
         # GLM-4 API密钥格式验证
-        if not re.match(r'^[a-f0-9]{32}\.[a-zA-Z0-9]{16}$', api_key):
+        if not _API_KEY_RE.match(api_key):
             log_error("GLM-4 API密钥格式无效")
             return False
         
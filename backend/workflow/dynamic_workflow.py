@@ -6,10 +6,13 @@
 调用关系:被orchestrator或API调用
 """
 import os
+import copy
+import hashlib
 import asyncio
 import subprocess
 import shutil
-from typing import Dict, List, Any, Optional
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
 from tools.compiler_tools.build_detector import BuildDetector
 from tools.compiler_tools.instrumented_builder import InstrumentedBuilder
 from tools.dynamic_analysis.dynamic_executor import DynamicExecutor
@@ -20,11 +23,16 @@ from utils.logger import log_info, log_error, log_warning
 class DynamicWorkflow:
     """动态分析工作流"""
 
+    # 顶层构建文件：其修改时间/大小作为检测结果缓存的失效依据
+    _BUILD_FILES = ('CMakeLists.txt', 'Makefile', 'makefile', 'GNUmakefile')
+
     def __init__(self):
         self.build_detector = BuildDetector()
         self.instrumented_builder = InstrumentedBuilder()
         self.dynamic_executor = DynamicExecutor()
         self.result_correlator = ResultCorrelator()
+        # (检测类型, 项目路径) -> (检查的目录, 构建文件签名, 检测结果)
+        self._detect_cache: Dict[tuple, tuple] = {}
 
     async def run_dynamic_analysis_workflow(
         self,
@@ -50,7 +58,9 @@ class DynamicWorkflow:
 
             # 步骤1: 检测构建系统
             log_info("📦 步骤1/5: 检测构建系统")
-            build_info = self.build_detector.detect_build_system(project_path)
+            build_info = self._cached_detect(
+                'build_system', project_path, self.build_detector.detect_build_system
+            )
             workflow_result['steps']['build_detection'] = build_info
             log_info(f"   构建系统: {build_info.get('build_system', '未检测到')}")
 
@@ -64,7 +74,10 @@ class DynamicWorkflow:
 
             # 步骤1.5: 多线程检测
             log_info("🔍 步骤1.5/5: 检测项目特征")
-            has_threads = self.dynamic_executor._detect_threading(project_path)
+            has_threads = self._cached_detect(
+                'threading', project_path, self.dynamic_executor._detect_threading,
+                build_info.get('project_root')
+            )
             workflow_result['steps']['threading_detection'] = {
                 'has_threads': has_threads
             }
@@ -103,19 +116,12 @@ class DynamicWorkflow:
                 
                 try:
                     # 清理
-                    subprocess.run(
-                        ['make', 'clean'], 
-                        cwd=btop_project_path,
-                        capture_output=True, 
-                        timeout=60,
-                        check=False
-                    )
+                    await self._clean_make_outputs(btop_project_path)
                     
                     # 编译(不带sanitizer)
-                    make_result = subprocess.run(
-                        ['make', '-j4'],
-                        cwd=btop_project_path,
-                        capture_output=True,
+                    make_result = await self._run_make(
+                        [f'-j{os.cpu_count() or 4}'],
+                        btop_project_path,
                         timeout=1800
                     )
                     
@@ -201,97 +207,51 @@ class DynamicWorkflow:
                 log_info(f"      - ASan/UBSan 版本（{asan_ubsan_sanitizers or '无'}）: {bool(asan_ubsan_sanitizers)}")
                 log_info(f"      - TSan 版本（thread）: {need_tsan_build}")
 
-                # 构建 1:Valgrind 专用
-                valgrind_exes: List[str] = []
+                # 三个构建版本互相独立：(版本名, 标题, sanitizers)
+                build_plan = []
                 if need_valgrind_build:
-                    log_info("   🔨 [构建A] Valgrind 版本(无Sanitizer)...")
-                    valgrind_build_dir = os.path.join(project_path, "build_valgrind")
-                    vg_result = await self.instrumented_builder.build_with_sanitizers(
-                        project_path,
-                        sanitizers=[],
-                        build_dir=valgrind_build_dir,
-                        clean_build=True
-                    )
-                    if vg_result.get('success'):
-                        valgrind_exes = vg_result.get('executables', []) or []
-                        
-                        # 🔥 立即备份到安全目录
-                        backup_dir = os.path.join(project_path, "_safe_valgrind")
-                        os.makedirs(backup_dir, exist_ok=True)
-                        safe_exes = []
-                        for exe in valgrind_exes:
-                            backup_path = os.path.join(backup_dir, os.path.basename(exe))
-                            shutil.copy2(exe, backup_path)
-                            safe_exes.append(backup_path)
-                            log_info(f"         📍 已备份: {backup_path}")
-                        
+                    build_plan.append(('valgrind', '[构建A] Valgrind 版本(无Sanitizer)', []))
+                if asan_ubsan_sanitizers:
+                    build_plan.append(('asan', '[构建B] ASan/UBSan 版本', asan_ubsan_sanitizers))
+                if need_tsan_build:
+                    build_plan.append(('tsan', '[构建C] TSan 版本(仅 -fsanitize=thread)', tsan_sanitizers))
+
+                build_coros = [
+                    self._build_and_backup(project_path, variant, title, sanitizers)
+                    for variant, title, sanitizers in build_plan
+                ]
+                if build_info.get('build_system') == 'cmake':
+                    # CMake 各版本在独立的 build_<版本> 目录中构建，可以并行
+                    log_info(f"   ⚡ 并行构建 {len(build_coros)} 个版本")
+                    build_results = await asyncio.gather(*build_coros, return_exceptions=True)
+                else:
+                    # Make 在源码目录内构建（make clean、共用 .o 文件），并行会互相破坏，只能串行
+                    build_results = []
+                    for coro in build_coros:
+                        try:
+                            build_results.append(await coro)
+                        except Exception as e:
+                            build_results.append(e)
+
+                for (variant, title, _), safe_exes in zip(build_plan, build_results):
+                    if isinstance(safe_exes, BaseException):
+                        log_error(f"      ❌ {title} 异常: {safe_exes}")
+                        safe_exes = None
+                    if safe_exes is None:
+                        if variant == 'tsan':
+                            log_warning("      ⚠️  将跳过 TSan 动态分析")
+                        continue
+
+                    if variant == 'valgrind':
                         for t in valgrind_tools:
                             executables_map[t] = list(safe_exes)
-                        log_info(f"      ✅ 成功并备份: {len(safe_exes)} 个文件")
-                    else:
-                        log_error(f"      ❌ 失败: {vg_result.get('error')}")
-
-                # 构建 2:ASan/UBSan 共用版本
-                asan_exes: List[str] = []
-                if asan_ubsan_sanitizers:
-                    log_info("   🔨 [构建B] ASan/UBSan 版本...")
-                    asan_build_dir = os.path.join(project_path, "build_asan")
-                    asan_result = await self.instrumented_builder.build_with_sanitizers(
-                        project_path,
-                        sanitizers=asan_ubsan_sanitizers,
-                        build_dir=asan_build_dir,
-                        clean_build=True
-                    )
-                    if asan_result.get('success'):
-                        asan_exes = asan_result.get('executables', []) or []
-                        
-                        # 🔥 立即备份
-                        backup_dir = os.path.join(project_path, "_safe_asan")
-                        os.makedirs(backup_dir, exist_ok=True)
-                        safe_exes = []
-                        for exe in asan_exes:
-                            backup_path = os.path.join(backup_dir, os.path.basename(exe))
-                            shutil.copy2(exe, backup_path)
-                            safe_exes.append(backup_path)
-                            log_info(f"         📍 已备份: {backup_path}")
-                        
+                    elif variant == 'asan':
                         if 'asan' in sanitizer_tools:
                             executables_map['asan'] = list(safe_exes)
                         if 'ubsan' in sanitizer_tools:
                             executables_map['ubsan'] = list(safe_exes)
-                        log_info(f"      ✅ 成功并备份: {len(safe_exes)} 个文件")
                     else:
-                        log_error(f"      ❌ 失败: {asan_result.get('error')}")
-
-                # 构建 3:TSan 独立版本
-                tsan_exes: List[str] = []
-                if need_tsan_build:
-                    log_info("   🔨 [构建C] TSan 版本(仅 -fsanitize=thread)...")
-                    tsan_build_dir = os.path.join(project_path, "build_tsan")
-                    tsan_result = await self.instrumented_builder.build_with_sanitizers(
-                        project_path,
-                        sanitizers=tsan_sanitizers,
-                        build_dir=tsan_build_dir,
-                        clean_build=True
-                    )
-                    if tsan_result.get('success'):
-                        tsan_exes = tsan_result.get('executables', []) or []
-                        
-                        # 🔥 立即备份
-                        backup_dir = os.path.join(project_path, "_safe_tsan")
-                        os.makedirs(backup_dir, exist_ok=True)
-                        safe_exes = []
-                        for exe in tsan_exes:
-                            backup_path = os.path.join(backup_dir, os.path.basename(exe))
-                            shutil.copy2(exe, backup_path)
-                            safe_exes.append(backup_path)
-                            log_info(f"         📍 已备份: {backup_path}")
-                        
                         executables_map['tsan'] = list(safe_exes)
-                        log_info(f"      ✅ TSan 构建成功并备份: {len(safe_exes)} 个文件")
-                    else:
-                        log_error(f"      ❌ TSan 构建失败: {tsan_result.get('error')}")
-                        log_warning("      ⚠️  将跳过 TSan 动态分析")
 
             # 检查可执行文件
             if not executables_map:
@@ -300,19 +260,26 @@ class DynamicWorkflow:
                     'error': '未生成任何可执行文件（所有构建均失败）'
                 }
 
-            # 步骤3：依次运行每个工具
+            total_executables = sum(map(len, executables_map.values()))
+
+            # 步骤3：并行运行各工具 × 可执行文件
             log_info("=" * 70)
-            log_info(f"🏃 步骤3/5: 依次运行动态分析工具")
+            log_info(f"🏃 步骤3/5: 并行运行动态分析工具")
             log_info(f"   工具总数: {len(tools)}")
             log_info("=" * 70)
 
-            executable_args = config.get('executable_args', [])
-            timeout = config.get('timeout', 300)
-            output_dir = config.get('output_dir', f'/tmp/dynamic_analysis_{project_id}')
+            # 各次运行共用的配置项
+            base_config = {
+                'executable_args': config.get('executable_args', []),
+                'timeout': config.get('timeout', 300)
+            }
+            output_root = config.get('output_dir', f'/tmp/dynamic_analysis_{project_id}')
 
             all_dynamic_issues: List[Dict[str, Any]] = []
             tool_results: List[Dict[str, Any]] = []
 
+            # 展开为 (工具, 可执行文件, 输出目录) 运行列表；每次运行使用独立的输出目录，并行时互不覆盖
+            runs: List[tuple] = []
             for tool_idx, tool_name in enumerate(tools, 1):
                 log_info(f"\n🔧 [{tool_idx}/{len(tools)}] 运行工具: {tool_name}")
 
@@ -325,40 +292,61 @@ class DynamicWorkflow:
 
                 for exe_idx, executable_path in enumerate(executables, 1):
                     log_info(f"   └─ [{exe_idx}/{len(executables)}] {executable_path}")
-
-                    analysis_config = {
-                        'tools': [tool_name],
-                        'executables_map': {tool_name: [executable_path]},
-                        'executable_path': executable_path,
-                        'executable_args': executable_args,
-                        'timeout': timeout,
-                        'output_dir': output_dir
-                    }
-
-                    exec_result = await self.dynamic_executor.execute_dynamic_analysis(
+                    # 不同目录下可能有同名可执行文件，目录名附加完整路径的短摘要以区分
+                    path_digest = hashlib.blake2b(executable_path.encode('utf-8'), digest_size=4).hexdigest()
+                    run_output_dir = os.path.join(
+                        output_root, tool_name, f"{os.path.basename(executable_path)}_{path_digest}"
+                    )
+                    os.makedirs(run_output_dir, exist_ok=True)
+                    runs.append((tool_name, executable_path, run_output_dir))
+
+            # Valgrind 为单线程进程，Sanitizer 程序本身可能多线程，并发数取 CPU 核数的一半
+            run_limit = asyncio.Semaphore(max(1, (os.cpu_count() or 2) // 2))
+
+            async def run_one(tool_name: str, executable_path: str, run_output_dir: str) -> Dict[str, Any]:
+                analysis_config = {
+                    **base_config,
+                    'tools': [tool_name],
+                    'executables_map': {tool_name: [executable_path]},
+                    'executable_path': executable_path,
+                    'output_dir': run_output_dir
+                }
+                async with run_limit:
+                    return await self.dynamic_executor.execute_dynamic_analysis(
                         project_path,
                         analysis_config
                     )
 
-                    if exec_result.get('success'):
-                        issues = exec_result.get('issues', []) or []
-                        log_info(f"      ✅ 发现 {len(issues)} 个问题")
-                        for issue in issues:
-                            issue['source_tool'] = tool_name
-                            issue['source_executable'] = executable_path
-                        all_dynamic_issues.extend(issues)
-                    else:
-                        log_warning(f"      ⚠️  执行失败: {exec_result.get('error')}")
-
-                    tool_results.append({
-                        'tool': tool_name,
-                        'executable': executable_path,
-                        'result': exec_result
-                    })
+            log_info(f"🚀 并行执行 {len(runs)} 个动态分析任务")
+            exec_results = await asyncio.gather(
+                *(run_one(*run) for run in runs),
+                return_exceptions=True
+            )
+
+            # 按原顺序汇总结果
+            for (tool_name, executable_path, _), exec_result in zip(runs, exec_results):
+                if isinstance(exec_result, BaseException):
+                    exec_result = {'success': False, 'error': str(exec_result)}
+
+                if exec_result.get('success'):
+                    issues = exec_result.get('issues', []) or []
+                    log_info(f"   ✅ {tool_name} [{os.path.basename(executable_path)}]: 发现 {len(issues)} 个问题")
+                    for issue in issues:
+                        issue['source_tool'] = tool_name
+                        issue['source_executable'] = executable_path
+                    all_dynamic_issues.extend(issues)
+                else:
+                    log_warning(f"   ⚠️  {tool_name} [{os.path.basename(executable_path)}] 执行失败: {exec_result.get('error')}")
+
+                tool_results.append({
+                    'tool': tool_name,
+                    'executable': executable_path,
+                    'result': exec_result
+                })
 
             workflow_result['steps']['dynamic_analysis'] = {
                 'tools_run': len(tools),
-                'executables_analyzed': sum(len(exes) for exes in executables_map.values()),
+                'executables_analyzed': total_executables,
                 'total_issues': len(all_dynamic_issues),
                 'tool_results': tool_results
             }
@@ -367,17 +355,14 @@ class DynamicWorkflow:
             log_info("=" * 70)
             log_info(f"📊 动态分析汇总:")
             log_info(f"   运行的工具数: {len(tools)}")
-            log_info(f"   分析的可执行文件总数: {sum(len(exes) for exes in executables_map.values())}")
+            log_info(f"   分析的可执行文件总数: {total_executables}")
             log_info(f"   发现的问题总数: {len(all_dynamic_issues)}")
 
+            # 各工具检出数（汇总日志与步骤5共用）
+            tool_count = Counter(issue.get('source_tool', 'unknown') for issue in all_dynamic_issues)
+
             if all_dynamic_issues:
-                severity_count: Dict[str, int] = {}
-                tool_count: Dict[str, int] = {}
-                for issue in all_dynamic_issues:
-                    sev = issue.get('severity', 'unknown')
-                    tool = issue.get('source_tool', 'unknown')
-                    severity_count[sev] = severity_count.get(sev, 0) + 1
-                    tool_count[tool] = tool_count.get(tool, 0) + 1
+                severity_count = Counter(issue.get('severity', 'unknown') for issue in all_dynamic_issues)
 
                 log_info(f"   问题严重程度分布:")
                 for sev, count in sorted(severity_count.items()):
@@ -414,32 +399,20 @@ class DynamicWorkflow:
             workflow_result['total_issues'] = len(all_dynamic_issues)
 
             # 统计实际运行的工具
-            tools_actually_run = set()
-            valgrind_actually_run = False
-            asan_actually_run = False
-            ubsan_actually_run = False
-            tsan_actually_run = False
-
-            for tr in tool_results:
-                tool_name = tr.get('tool', '')
-                ok = tr.get('result', {}).get('success', False)
-                if not ok:
-                    continue
-                tools_actually_run.add(tool_name)
-                if tool_name.startswith('valgrind'):
-                    valgrind_actually_run = True
-                elif tool_name in ['asan', 'address_sanitizer']:
-                    asan_actually_run = True
-                elif tool_name in ['ubsan', 'undefined_sanitizer']:
-                    ubsan_actually_run = True
-                elif tool_name == 'tsan':
-                    tsan_actually_run = True
+            tools_actually_run = {
+                tr.get('tool', '') for tr in tool_results
+                if tr.get('result', {}).get('success', False)
+            }
+            valgrind_actually_run = any(t.startswith('valgrind') for t in tools_actually_run)
+            asan_actually_run = not tools_actually_run.isdisjoint(('asan', 'address_sanitizer'))
+            ubsan_actually_run = not tools_actually_run.isdisjoint(('ubsan', 'undefined_sanitizer'))
+            tsan_actually_run = 'tsan' in tools_actually_run
 
             # 各工具问题数
-            valgrind_issue_count = sum(1 for i in all_dynamic_issues if i.get('source_tool', '').startswith('valgrind'))
-            asan_issue_count = sum(1 for i in all_dynamic_issues if i.get('source_tool', '') in ['asan', 'address_sanitizer'])
-            ubsan_issue_count = sum(1 for i in all_dynamic_issues if i.get('source_tool', '') in ['ubsan', 'undefined_sanitizer'])
-            tsan_issue_count = sum(1 for i in all_dynamic_issues if i.get('source_tool', '') == 'tsan')
+            valgrind_issue_count = sum(count for tool, count in tool_count.items() if tool.startswith('valgrind'))
+            asan_issue_count = tool_count['asan'] + tool_count['address_sanitizer']
+            ubsan_issue_count = tool_count['ubsan'] + tool_count['undefined_sanitizer']
+            tsan_issue_count = tool_count['tsan']
 
             # 动态执行信息
             workflow_result['dynamic_execution'] = {
@@ -457,7 +430,7 @@ class DynamicWorkflow:
                     tool: [os.path.basename(exe) for exe in exes]
                     for tool, exes in executables_map.items()
                 },
-                'total_executables_analyzed': sum(len(exes) for exes in executables_map.values())
+                'total_executables_analyzed': total_executables
             }
 
             log_info("=" * 70)
@@ -506,6 +479,139 @@ class DynamicWorkflow:
                 'project_id': project_id
             }
 
+    def _build_files_stamp(self, dirs: tuple) -> tuple:
+        """收集各目录顶层构建文件的 (mtime_ns, size) 签名"""
+        stamp = []
+        for directory in dirs:
+            for name in self._BUILD_FILES:
+                try:
+                    st = os.stat(os.path.join(directory, name))
+                except OSError:
+                    continue
+                stamp.append((directory, name, st.st_mtime_ns, st.st_size))
+        return tuple(stamp)
+
+    def _cached_detect(
+        self,
+        kind: str,
+        project_path: str,
+        detect: Callable[[str], Any],
+        project_root: Optional[str] = None
+    ) -> Any:
+        """带缓存地执行项目检测（构建系统/多线程）
+
+        项目根目录及实际项目目录下的构建文件未变化时直接返回上次的检测结果
+        """
+        key = (kind, project_path)
+        cached = self._detect_cache.get(key)
+        if cached is not None:
+            dirs, stamp, result = cached
+            if self._build_files_stamp(dirs) == stamp:
+                log_info(f"   ♻️  复用缓存的检测结果: {kind}")
+                return copy.deepcopy(result)
+
+        result = detect(project_path)
+
+        if isinstance(result, dict):
+            project_root = result.get('project_root') or project_root
+        dirs = tuple(dict.fromkeys(d for d in (project_path, project_root) if d))
+        self._detect_cache[key] = (dirs, self._build_files_stamp(dirs), copy.deepcopy(result))
+        return result
+
+    async def _clean_make_outputs(self, project_path: str):
+        """清理原生 Makefile 构建的产物
+
+        Makefile 定义了 clean 目标时执行 make clean；否则只删除 Makefile 默认的
+        obj/ 与 bin/ 输出目录，不触碰项目中其它目录和文件
+        """
+        makefile = os.path.join(project_path, 'Makefile')
+        try:
+            with open(makefile, 'r', encoding='utf-8', errors='ignore') as f:
+                has_clean = any(line.startswith('clean:') for line in f)
+        except OSError:
+            has_clean = False
+
+        if has_clean:
+            await self._run_make(['clean'], project_path, timeout=60)
+            return
+
+        for out_dir in ('obj', 'bin'):
+            shutil.rmtree(os.path.join(project_path, out_dir), ignore_errors=True)
+
+    async def _run_make(
+        self,
+        args: List[str],
+        cwd: str,
+        timeout: int
+    ) -> subprocess.CompletedProcess:
+        """异步运行 make，不阻塞事件循环；超时则终止进程并抛出 asyncio.TimeoutError"""
+        proc = await asyncio.create_subprocess_exec(
+            'make', *args,
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+        return subprocess.CompletedProcess(['make', *args], proc.returncode, stdout, stderr)
+
+    async def _build_and_backup(
+        self,
+        project_path: str,
+        variant: str,
+        title: str,
+        sanitizers: List[str]
+    ) -> Optional[List[str]]:
+        """构建一个插桩版本（build_<variant>），成功后立即备份产物到 _safe_<variant>
+
+        返回备份后的可执行文件路径列表，构建失败返回None
+        """
+        log_info(f"   🔨 {title}...")
+        result = await self.instrumented_builder.build_with_sanitizers(
+            project_path,
+            sanitizers=sanitizers,
+            build_dir=os.path.join(project_path, f"build_{variant}"),
+            clean_build=True
+        )
+        if not result.get('success'):
+            log_error(f"      ❌ {title} 失败: {result.get('error')}")
+            return None
+
+        exes = result.get('executables', []) or []
+
+        # 🔥 立即备份到安全目录
+        backup_dir = os.path.join(project_path, f"_safe_{variant}")
+        os.makedirs(backup_dir, exist_ok=True)
+        basenames = [os.path.basename(exe) for exe in exes]
+        safe_exes = []
+        name_seen = Counter()
+        for name in basenames:
+            # 同名文件（项目根目录与构建目录各有一个）放入编号子目录，备份互不覆盖
+            dup = name_seen[name]
+            name_seen[name] += 1
+            target_dir = os.path.join(backup_dir, str(dup)) if dup else backup_dir
+            if dup:
+                os.makedirs(target_dir, exist_ok=True)
+            safe_exes.append(os.path.join(target_dir, name))
+        for exe, backup_path in zip(exes, safe_exes):
+            if os.path.lexists(backup_path):
+                os.remove(backup_path)
+            try:
+                # 硬链接：构建目录被清理后产物仍保留，且无需复制文件内容
+                os.link(exe, backup_path)
+            except OSError:
+                # 跨文件系统或不支持硬链接时回退为复制
+                shutil.copy2(exe, backup_path)
+        if basenames:
+            log_info(f"         📍 已备份到 {backup_dir}: {', '.join(basenames)}")
+
+        log_info(f"      ✅ {title} 成功并备份: {len(safe_exes)} 个文件")
+        return safe_exes
+
     async def run_simple_dynamic_check(
         self,
         executable_path: str,